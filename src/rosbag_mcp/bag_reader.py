@@ -1,17 +1,30 @@
 from __future__ import annotations
 
+import array
+import json
 import logging
 import os
+import sys
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
 from dataclasses import dataclass
+from functools import lru_cache
+from itertools import islice, repeat
 from pathlib import Path
-from typing import Any, Iterator
+from typing import Any, Callable, Iterator
 
-from rosbag_mcp.cache import BagCacheManager, TopicTimeIndex
+import numpy as np
+
+from rosbag_mcp.cache import BagCacheManager, CachedTopic, TopicTimeIndex
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
 
 logger = logging.getLogger(__name__)
 
 
-@dataclass
+@dataclass(slots=True)
 class BagInfo:
     path: str
     duration: float
@@ -21,7 +34,7 @@ class BagInfo:
     topics: list[dict[str, Any]]
 
 
-@dataclass
+@dataclass(slots=True)
 class BagMessage:
     topic: str
     timestamp: float
@@ -38,16 +51,22 @@ _state = BagReaderState()
 _cache = BagCacheManager()
 
 
+@lru_cache(maxsize=128)
+def _expand(path: str) -> str:
+    """Memoized os.path.expanduser; interned so handle-dict lookups are fast."""
+    return sys.intern(os.path.expanduser(path))
+
+
 def _resolve_path(bag_path: str | None) -> str:
     """Resolve bag path from argument or state."""
     path = bag_path or _state.current_bag_path
     if not path:
         raise ValueError("No bag path set. Call set_bag_path first or provide a bag_path.")
-    return os.path.expanduser(path)
+    return _expand(path)
 
 
 def set_bag_path(path: str) -> str:
-    path = os.path.expanduser(path)
+    path = _expand(path)
     if os.path.isfile(path):
         _state.current_bag_path = path
         _state.current_bags_dir = os.path.dirname(path)
@@ -70,40 +89,110 @@ def get_current_bags_dir() -> str | None:
     return _state.current_bags_dir
 
 
+def close_bag(bag_path: str | None = None) -> str:
+    """Evict the cached handle (reader, indexes, message cache) for a bag."""
+    path = _resolve_path(bag_path)
+    _cache.invalidate(path)
+    logger.info("Closed cached handle for: %s", path)
+    return f"Closed cached handle for: {path}"
+
+
 def list_bags(directory: str | None = None) -> list[dict[str, Any]]:
     search_dir = directory or _state.current_bags_dir
     if not search_dir:
         raise ValueError("No directory set. Call set_bag_path first or provide a directory.")
 
-    search_dir = os.path.expanduser(search_dir)
-    bags = []
-
-    for root, dirs, files in os.walk(search_dir):
-        for f in files:
-            if f.endswith((".bag", ".mcap", ".db3")):
-                full_path = os.path.join(root, f)
-                bags.append(
-                    {
-                        "path": full_path,
-                        "name": f,
-                        "format": Path(f).suffix[1:],
-                        "size_mb": round(os.path.getsize(full_path) / (1024 * 1024), 2),
-                    }
-                )
+    search_dir = _expand(search_dir)
+    bags: list[dict[str, Any]] = []
+
+    # Directory scans are syscall-bound; overlapping them in a small thread
+    # pool hides stat latency on slow (NFS/HDD) storage.
+    with ThreadPoolExecutor(max_workers=_SCAN_WORKERS) as pool:
+        pending = {pool.submit(_scan_bags_dir, search_dir)}
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                found, subdirs = future.result()
+                bags.extend(found)
+                for sub in subdirs:
+                    pending.add(pool.submit(_scan_bags_dir, sub))
+
+    # Concurrent completion order is nondeterministic; sort for stable output
+    bags.sort(key=lambda b: b["path"])
+    return bags
+
+
+_SCAN_WORKERS = 8
 
-        if "metadata.yaml" in files:
+# Records deserialized per inner-loop batch in read_messages.
+_BATCH_SIZE = 256
+
+# Opt-in parallel decode (RB_MCP_PARALLEL=1): the rosbags C decode path
+# releases the GIL, so a small pool overlaps decode across cores.
+_DESERIALIZE_WORKERS = 4
+_deserialize_pool: ThreadPoolExecutor | None = None
+
+
+def _get_deserialize_pool() -> ThreadPoolExecutor:
+    global _deserialize_pool
+    if _deserialize_pool is None:
+        _deserialize_pool = ThreadPoolExecutor(max_workers=_DESERIALIZE_WORKERS)
+    return _deserialize_pool
+
+
+def _scan_bags_dir(root: str) -> tuple[list[dict[str, Any]], list[str]]:
+    """Collect bag files in one directory using a single scandir pass.
+
+    Returns (bags found here, subdirectories to descend into).  DirEntry.stat()
+    reuses the stat from the directory read, so each file is stat'd once
+    instead of re-stat'd via os.path.getsize.
+    """
+    try:
+        with os.scandir(root) as it:
+            entries = list(it)
+    except OSError:
+        return [], []
+
+    bags: list[dict[str, Any]] = []
+    subdirs: list[str] = []
+    has_metadata = False
+    total_size = 0
+
+    for entry in entries:
+        if entry.is_dir(follow_symlinks=False):
+            subdirs.append(entry.path)
+            continue
+        if not entry.is_file():
+            continue
+
+        size = entry.stat().st_size
+        total_size += size
+
+        if entry.name == "metadata.yaml":
+            has_metadata = True
+        if entry.name.endswith((".bag", ".mcap", ".db3")):
             bags.append(
                 {
-                    "path": root,
-                    "name": os.path.basename(root),
-                    "format": "ros2_directory",
-                    "size_mb": sum(os.path.getsize(os.path.join(root, f)) for f in files)
-                    / (1024 * 1024),
+                    "path": entry.path,
+                    "name": entry.name,
+                    "format": Path(entry.name).suffix[1:],
+                    "size_mb": round(size / (1024 * 1024), 2),
                 }
             )
-            dirs.clear()
 
-    return bags
+    if has_metadata:
+        bags.append(
+            {
+                "path": root,
+                "name": os.path.basename(root),
+                "format": "ros2_directory",
+                "size_mb": total_size / (1024 * 1024),
+            }
+        )
+        # ROS 2 bag directory — don't descend into it
+        return bags, []
+
+    return bags, subdirs
 
 
 def get_bag_info(bag_path: str | None = None) -> BagInfo:
@@ -113,26 +202,30 @@ def get_bag_info(bag_path: str | None = None) -> BagInfo:
     # Check cache first
     cached_info = handle.meta.get("bag_info")
     if cached_info is not None:
-        logger.debug(f"Cache hit: bag_info for {path}")
+        logger.debug("Cache hit: bag_info for %s", path)
         return cached_info
 
     # Cache miss - compute and store
-    logger.debug(f"Cache miss: bag_info for {path}")
+    logger.debug("Cache miss: bag_info for %s", path)
     with handle.reader_ctx() as reader:
-        topics = []
+        # Single pass over the connection list: build the topic dicts and
+        # accumulate the total count in one walk.
+        topics: list[dict[str, Any]] = []
+        message_count = 0
         for conn in reader.connections:
+            count = conn.msgcount
             topics.append(
                 {
                     "name": conn.topic,
                     "type": conn.msgtype,
-                    "count": conn.msgcount,
+                    "count": count,
                 }
             )
+            message_count += count or 0
 
         duration = (reader.end_time - reader.start_time) / 1e9
         start_time = reader.start_time / 1e9
         end_time = reader.end_time / 1e9
-        message_count = sum(c.msgcount for c in reader.connections)
 
         bag_info = BagInfo(
             path=path,
@@ -163,6 +256,113 @@ def _msg_to_dict(msg: Any) -> Any:
         return msg
 
 
+# Per-msgtype flatteners compiled from a sample message.  The recursive
+# _msg_to_dict walk is interpreter-bound (hasattr/getattr per field per
+# message); for high-frequency topics we instead generate straight-line code
+# that inlines the field structure once and reuse it for every message of
+# that type.
+_FLATTENERS: dict[str, Callable[[Any], Any]] = {}
+
+# Bulk-payload sensor types: .tolist() on a megapixel image is millions of
+# boxed Python ints; keep the numpy array as-is in BagMessage.data instead.
+# json_serialize already knows how to render arrays when a result is emitted.
+_ZERO_COPY_TYPES = frozenset(
+    {
+        "sensor_msgs/msg/Image",
+        "sensor_msgs/msg/CompressedImage",
+        "sensor_msgs/msg/PointCloud2",
+        "sensor_msgs/msg/LaserScan",
+        "sensor_msgs/Image",
+        "sensor_msgs/CompressedImage",
+        "sensor_msgs/PointCloud2",
+        "sensor_msgs/LaserScan",
+    }
+)
+
+
+def _compile_flattener(msgtype: str, sample: Any, zero_copy: bool = False) -> Callable[[Any], Any]:
+    """Generate a specialized flatten function from a sample message's structure."""
+
+    def emit(expr: str, value: Any) -> str:
+        if hasattr(value, "__dataclass_fields__"):
+            parts = []
+            for field_name in value.__dataclass_fields__:
+                child = emit(f"{expr}.{field_name}", getattr(value, field_name))
+                parts.append(f"{field_name!r}: {child}")
+            return "{" + ", ".join(parts) + "}"
+        elif isinstance(value, (list, tuple)):
+            # Element structure may vary between messages; keep the generic walk
+            return f"_msg_to_dict({expr})"
+        elif hasattr(value, "tolist"):
+            # Zero-copy types hand the array through untouched
+            return expr if zero_copy else f"{expr}.tolist()"
+        else:
+            return expr
+
+    src = f"def _flatten(m):\n    return {emit('m', sample)}\n"
+    namespace: dict[str, Any] = {"_msg_to_dict": _msg_to_dict}
+    exec(compile(src, f"<flatten:{msgtype}>", "exec"), namespace)
+    return namespace["_flatten"]
+
+
+def _flatten_msg(msg: Any, msgtype: str) -> Any:
+    """Convert a deserialized message to a dict using a cached per-type flattener."""
+    flatten = _FLATTENERS.get(msgtype)
+    if flatten is None:
+        flatten = _compile_flattener(msgtype, msg, zero_copy=msgtype in _ZERO_COPY_TYPES)
+        _FLATTENERS[msgtype] = flatten
+    try:
+        return flatten(msg)
+    except (AttributeError, TypeError):
+        # Structure diverged from the sampled message — fall back to the
+        # generic walk for this message.
+        return _msg_to_dict(msg)
+
+
+# Python-side overhead (dict/list/object headers) per message, sampled once
+# per msgtype so cache accounting reflects resident size, not just payload.
+_MSG_OVERHEAD: dict[str, int] = {}
+_SIZEOF_MAX_DEPTH = 8
+
+
+def _deep_sizeof(obj: Any, depth: int = 0) -> int:
+    size = sys.getsizeof(obj)
+    if depth >= _SIZEOF_MAX_DEPTH:
+        return size
+    if isinstance(obj, dict):
+        for key, value in obj.items():
+            size += _deep_sizeof(key, depth + 1)
+            size += _deep_sizeof(value, depth + 1)
+    elif isinstance(obj, (list, tuple)):
+        for item in obj:
+            size += _deep_sizeof(item, depth + 1)
+    return size
+
+
+def _materialize_cached(handle: Any, entry: CachedTopic, lo: int, hi: int) -> Iterator[BagMessage]:
+    """Yield BagMessages for a cached slice, deserializing raw payloads on demand.
+
+    Deserialized dicts are memoized back into the entry so each message pays
+    the deserialize+flatten cost at most once across reads.
+    """
+    data = entry.data
+    if any(data[i] is None for i in range(lo, hi)):
+        with handle.reader_ctx() as reader:
+            for i in range(lo, hi):
+                if data[i] is None:
+                    msg = reader.deserialize(entry.raw[i], entry.msg_type)
+                    data[i] = _flatten_msg(msg, entry.msg_type)
+
+    ts_ns = entry.timestamps_ns
+    for i in range(lo, hi):
+        yield BagMessage(
+            topic=entry.topic,
+            timestamp=ts_ns[i] / 1e9,
+            data=data[i],
+            msg_type=entry.msg_type,
+        )
+
+
 def read_messages(
     bag_path: str | None = None,
     topics: list[str] | None = None,
@@ -177,82 +377,191 @@ def read_messages(
     end_ns = int(end_time * 1e9) if end_time else None
 
     # --- Fast path: serve from message cache ---
-    if single_topic and handle.message_cache.has(topics[0]):
-        cached = handle.message_cache.get_range(topics[0], start_ns, end_ns)
+    if single_topic:
+        cached = handle.message_cache.get(topics[0])
         if cached is not None:
-            logger.debug("Message cache hit: %s (%d messages)", topics[0], len(cached))
-            yield from cached
+            lo, hi = cached.slice_range(start_ns, end_ns)
+            logger.debug("Message cache hit: %s (%d messages)", topics[0], hi - lo)
+            yield from _materialize_cached(handle, cached, lo, hi)
             return
 
     # --- Slow path: read from disk ---
     no_time_filter = start_time is None and end_time is None
     build_index = single_topic and no_time_filter
     topic_for_index = topics[0] if build_index else None
-    timestamps_ns: list[int] | None = [] if build_index else None
-
-    should_collect = single_topic and no_time_filter and not handle.message_cache.has(topics[0])
-    collected: list[BagMessage] | None = [] if should_collect else None
+    # array('q') keeps the accumulating stamps unboxed (8 bytes each)
+    timestamps_ns: array.array | None = array.array("q") if build_index else None
+
+    # Reaching here with a single topic means the cache lookup above missed,
+    # so there is nothing to re-check before collecting.
+    should_collect = single_topic and no_time_filter
+    collected_ts: list[int] | None = [] if should_collect else None
+    collected_raw: list[bytes] | None = [] if should_collect else None
+    collected_msgtype: str | None = None
     collected_bytes = 0
+    cache_budget = 0
     completed = False
 
     with handle.reader_ctx() as reader:
         connections = reader.connections
         if topics:
-            connections = [c for c in connections if c.topic in topics]
+            # frozenset membership keeps this O(N) for multi-topic reads
+            topic_set = frozenset(topics)
+            connections = [c for c in connections if c.topic in topic_set]
+
+        # With a single connection, conn is invariant — hoist the attribute
+        # lookups (CPython's LOAD_ATTR per iteration) out of the loop.
+        deserialize = reader.deserialize
+        if len(connections) == 1:
+            only_conn = connections[0]
+            only_topic = only_conn.topic
+            only_msgtype = only_conn.msgtype
+        else:
+            only_conn = None
+            only_topic = only_msgtype = ""
 
         try:
-            for conn, timestamp, rawdata in reader.messages(connections=connections):
-                ts_sec = timestamp / 1e9
-
-                if start_ns and timestamp < start_ns:
-                    continue
-                if end_ns and timestamp > end_ns:
+            # Let the reader seek via its index instead of linearly skipping
+            # the prefix: start/stop prune both the scan and deserialization.
+            # stop is exclusive; the old loop treated end_time as inclusive.
+            source = reader.messages(
+                connections=connections,
+                start=start_ns,
+                stop=end_ns + 1 if end_ns is not None else None,
+            )
+            # Pull records in batches and deserialize each batch in one tight
+            # comprehension before the bookkeeping pass: the per-message loop
+            # overhead is amortized over _BATCH_SIZE records.
+            parallel = os.environ.get("RB_MCP_PARALLEL") == "1"
+            while True:
+                batch = list(islice(source, _BATCH_SIZE))
+                if not batch:
                     break
 
-                if build_index and timestamps_ns is not None:
-                    timestamps_ns.append(timestamp)
-
-                # Size gate: check first message raw payload
-                if collected is not None and collected_bytes == 0:
-                    msg_count = conn.msgcount or 0
-                    if not handle.message_cache.can_cache(len(rawdata), msg_count):
-                        logger.debug(
-                            "Skipping message cache for %s (raw=%d bytes, count=%d)",
-                            conn.topic,
-                            len(rawdata),
-                            msg_count,
+                if parallel and len(batch) > 1:
+                    # executor.map preserves input order, so yields stay sorted
+                    pool = _get_deserialize_pool()
+                    if only_conn is not None:
+                        msgs = list(
+                            pool.map(deserialize, (r for _, _, r in batch), repeat(only_msgtype))
                         )
-                        collected = None
-
-                msg = reader.deserialize(rawdata, conn.msgtype)
-                bag_msg = BagMessage(
-                    topic=conn.topic,
-                    timestamp=ts_sec,
-                    data=_msg_to_dict(msg),
-                    msg_type=conn.msgtype,
-                )
-
-                if collected is not None:
-                    collected.append(bag_msg)
-                    collected_bytes += len(rawdata) + 200
-                    if not handle.message_cache.budget_ok(collected_bytes):
-                        logger.debug(
-                            "Aborting message cache for %s (budget exceeded at %d bytes)",
-                            conn.topic,
-                            collected_bytes,
+                    else:
+                        msgs = list(
+                            pool.map(
+                                deserialize,
+                                (r for _, _, r in batch),
+                                (c.msgtype for c, _, _ in batch),
+                            )
                         )
-                        collected = None
-                        collected_bytes = 0
+                elif only_conn is not None:
+                    msgs = [deserialize(rawdata, only_msgtype) for _, _, rawdata in batch]
+                else:
+                    msgs = [deserialize(rawdata, conn.msgtype) for conn, _, rawdata in batch]
+
+                for (conn, timestamp, rawdata), msg in zip(batch, msgs):
+                    if conn is only_conn:
+                        topic_name = only_topic
+                        msgtype = only_msgtype
+                    else:
+                        topic_name = conn.topic
+                        msgtype = conn.msgtype
+
+                    if build_index and timestamps_ns is not None:
+                        timestamps_ns.append(timestamp)
+
+                    # Size gate: check first message raw payload and grab the
+                    # byte budget once — later messages compare against it
+                    if collected_raw is not None and collected_bytes == 0:
+                        msg_count = conn.msgcount or 0
+                        cache_budget = handle.message_cache.reserve(len(rawdata), msg_count)
+                        if cache_budget is None:
+                            logger.debug(
+                                "Skipping message cache for %s (raw=%d bytes, count=%d)",
+                                topic_name,
+                                len(rawdata),
+                                msg_count,
+                            )
+                            collected_raw = None
+
+                    bag_msg = BagMessage(
+                        topic=topic_name,
+                        # Only convert to float seconds at emit time
+                        timestamp=timestamp / 1e9,
+                        data=_flatten_msg(msg, msgtype),
+                        msg_type=msgtype,
+                    )
 
-                yield bag_msg
+                    if collected_raw is not None and collected_ts is not None:
+                        overhead = _MSG_OVERHEAD.get(msgtype)
+                        if overhead is None:
+                            overhead = max(_deep_sizeof(bag_msg.data) - len(rawdata), 0)
+                            _MSG_OVERHEAD[msgtype] = overhead
+                        collected_ts.append(timestamp)
+                        collected_raw.append(bytes(rawdata))
+                        collected_msgtype = msgtype
+                        collected_bytes += len(rawdata) + overhead
+                        if collected_bytes > cache_budget:
+                            logger.debug(
+                                "Aborting message cache for %s (budget exceeded at %d bytes)",
+                                topic_name,
+                                collected_bytes,
+                            )
+                            collected_raw = None
+                            collected_bytes = 0
+
+                    yield bag_msg
             completed = True
         finally:
-            if build_index and topic_for_index and timestamps_ns:
+            # Like the message-cache commit below, only a fully-consumed scan
+            # may store (and persist) an index: an abandoned generator — any
+            # limit/max_messages caller — has only seen a prefix of the topic.
+            if completed and build_index and topic_for_index and timestamps_ns:
                 index = TopicTimeIndex(timestamps_ns=timestamps_ns)
                 handle.store_index(topic_for_index, index)
 
-            if completed and collected is not None and collected:
-                handle.message_cache.commit(topics[0], collected, collected_bytes)
+            if completed and collected_raw:
+                entry = CachedTopic(
+                    topic=topics[0],
+                    msg_type=collected_msgtype or "",
+                    timestamps_ns=np.asarray(collected_ts, dtype=np.int64),
+                    raw=collected_raw,
+                    data=[None] * len(collected_raw),
+                )
+                handle.message_cache.commit(topics[0], entry, collected_bytes)
+
+
+def _json_default(obj: Any) -> Any:
+    if hasattr(obj, "tolist"):
+        return obj.tolist()
+    return str(obj)
+
+
+def read_messages_json(
+    topics: list[str] | None = None,
+    start_time: float | None = None,
+    end_time: float | None = None,
+    bag_path: str | None = None,
+) -> Iterator[bytes]:
+    """Like read_messages, but yield each message pre-encoded as JSON bytes.
+
+    With orjson available this serializes numpy arrays directly
+    (OPT_SERIALIZE_NUMPY), so bulk payloads kept as ndarrays by the
+    flatteners never round-trip through Python lists.  Falls back to the
+    stdlib json encoder when orjson is not installed.
+    """
+    for msg in read_messages(
+        bag_path=bag_path, topics=topics, start_time=start_time, end_time=end_time
+    ):
+        record = {
+            "topic": msg.topic,
+            "timestamp": msg.timestamp,
+            "msg_type": msg.msg_type,
+            "data": msg.data,
+        }
+        if orjson is not None:
+            yield orjson.dumps(record, option=orjson.OPT_SERIALIZE_NUMPY)
+        else:
+            yield json.dumps(record, default=_json_default).encode()
 
 
 def get_message_at_time(
@@ -267,73 +576,68 @@ def get_message_at_time(
     tolerance_ns = int(tolerance * 1e9)
 
     if index is not None:
-        # Fast path: use index to find nearest timestamp
-        nearest_ts = index.find_nearest(target_ns, tolerance_ns)
-        if nearest_ts is None:
-            logger.debug(f"Index lookup: no message within tolerance for {topic} at {target_time}")
+        # Fast path: binary-search the index for the nearest timestamp, then
+        # seek the reader to exactly that record.  rosbags does not expose
+        # per-message byte offsets, so the exact-timestamp start/stop window
+        # (which seeks via the bag's own index) is the jump-to-one-message
+        # equivalent: one record read, one deserialize.
+        pos = index.find_nearest(target_ns, tolerance_ns)
+        if pos is None:
+            logger.debug(
+                "Index lookup: no message within tolerance for %s at %s", topic, target_time
+            )
             return None
 
-        # Scan near the indexed timestamp
-        logger.debug(f"Index hit: {topic} at {target_time} -> {nearest_ts / 1e9}")
+        nearest_ts = int(index.timestamps_ns[pos])
+        logger.debug("Index hit: %s at %s -> %s", topic, target_time, nearest_ts / 1e9)
         with handle.reader_ctx() as reader:
-            connections = [c for c in reader.connections if c.topic == topic]
+            connections = handle.connections_for_topic(topic)
             if not connections:
                 return None
 
-            # Scan a small window around the indexed timestamp
-            window_start = nearest_ts - tolerance_ns
-            window_end = nearest_ts + tolerance_ns
-
-            closest_msg = None
-            min_diff = float("inf")
-
-            for conn, timestamp, rawdata in reader.messages(connections=connections):
-                if timestamp < window_start:
-                    continue
-                if timestamp > window_end:
-                    break
-
-                diff = abs(timestamp - target_ns)
-                if diff < min_diff:
-                    min_diff = diff
-                    msg = reader.deserialize(rawdata, conn.msgtype)
-                    closest_msg = BagMessage(
-                        topic=conn.topic,
-                        timestamp=timestamp / 1e9,
-                        data=_msg_to_dict(msg),
-                        msg_type=conn.msgtype,
-                    )
+            for conn, timestamp, rawdata in reader.messages(
+                connections=connections, start=nearest_ts, stop=nearest_ts + 1
+            ):
+                msg = reader.deserialize(rawdata, conn.msgtype)
+                return BagMessage(
+                    topic=conn.topic,
+                    timestamp=timestamp / 1e9,
+                    data=_flatten_msg(msg, conn.msgtype),
+                    msg_type=conn.msgtype,
+                )
 
-            return closest_msg if closest_msg and min_diff <= tolerance_ns else None
+            return None
 
     # Slow path: full scan (no index available)
-    logger.debug(f"Index miss: full scan for {topic} at {target_time}")
+    logger.debug("Index miss: full scan for %s at %s", topic, target_time)
     with handle.reader_ctx() as reader:
-        connections = [c for c in reader.connections if c.topic == topic]
+        connections = handle.connections_for_topic(topic)
         if not connections:
             return None
 
         closest_msg = None
-        min_diff = float("inf")
+        min_diff: int | float = float("inf")
 
+        # Compare in integer nanosecond space; ns stamps don't round-trip
+        # exactly through float64 and the divide costs a boxed float per
+        # message.
         for conn, timestamp, rawdata in reader.messages(connections=connections):
-            ts_sec = timestamp / 1e9
-            diff = abs(ts_sec - target_time)
+            diff = abs(timestamp - target_ns)
 
             if diff < min_diff:
                 min_diff = diff
                 msg = reader.deserialize(rawdata, conn.msgtype)
                 closest_msg = BagMessage(
                     topic=conn.topic,
-                    timestamp=ts_sec,
-                    data=_msg_to_dict(msg),
+                    timestamp=timestamp / 1e9,
+                    data=_flatten_msg(msg, conn.msgtype),
                     msg_type=conn.msgtype,
                 )
 
-            if ts_sec > target_time + tolerance:
+            if timestamp > target_ns + tolerance_ns:
                 break
 
-        if closest_msg and min_diff <= tolerance:
+        if closest_msg and min_diff <= tolerance_ns:
             return closest_msg
         return closest_msg
 
@@ -355,6 +659,37 @@ def get_messages_in_range(
     return messages
 
 
+# Schemas depend only on the message type, not on which bag or topic carried
+# it — cache them module-wide so a type sampled once is never re-sampled.
+_SCHEMA_BY_MSGTYPE: dict[str, tuple[dict[str, Any], Any]] = {}
+
+
+def _extract_schema(data: Any, depth: int = 0) -> dict[str, Any]:
+    if isinstance(data, dict):
+        return {
+            "type": "object",
+            "fields": {k: _extract_schema(v, depth + 1) for k, v in data.items()},
+        }
+    elif isinstance(data, list):
+        if len(data) > 0:
+            return {
+                "type": "array",
+                "length": len(data),
+                "element_type": _extract_schema(data[0], depth + 1),
+            }
+        return {"type": "array", "length": 0, "element_type": "unknown"}
+    elif isinstance(data, float):
+        return {"type": "float64"}
+    elif isinstance(data, int):
+        return {"type": "int"}
+    elif isinstance(data, bool):
+        return {"type": "bool"}
+    elif isinstance(data, str):
+        return {"type": "string"}
+    else:
+        return {"type": str(type(data).__name__)}
+
+
 def get_topic_schema(topic: str, bag_path: str | None = None) -> dict[str, Any]:
     """Get the message structure/schema for a topic by sampling a message."""
     path = _resolve_path(bag_path)
@@ -364,63 +699,47 @@ def get_topic_schema(topic: str, bag_path: str | None = None) -> dict[str, Any]:
     cache_key = f"schema:{topic}"
     cached_schema = handle.meta.get(cache_key)
     if cached_schema is not None:
-        logger.debug(f"Cache hit: schema for {topic}")
+        logger.debug("Cache hit: schema for %s", topic)
         return cached_schema
 
-    # Cache miss - compute and store
-    logger.debug(f"Cache miss: schema for {topic}")
-    with handle.reader_ctx() as reader:
-        connections = [c for c in reader.connections if c.topic == topic]
-        if not connections:
-            raise ValueError(f"Topic '{topic}' not found in bag")
+    # The connection list gives us the msg_type without touching messages;
+    # if this type was sampled before (any bag, any topic), reuse it.
+    connections = handle.connections_for_topic(topic)
+    if not connections:
+        raise ValueError(f"Topic '{topic}' not found in bag")
 
-        conn = connections[0]
-        msg_type = conn.msgtype
+    conn = connections[0]
+    msg_type = conn.msgtype
 
-        sample_data = None
-        for conn_iter, timestamp, rawdata in reader.messages(connections=connections):
-            msg = reader.deserialize(rawdata, conn_iter.msgtype)
-            sample_data = _msg_to_dict(msg)
-            break
-
-        def _extract_schema(data: Any, depth: int = 0) -> dict[str, Any]:
-            if isinstance(data, dict):
-                return {
-                    "type": "object",
-                    "fields": {k: _extract_schema(v, depth + 1) for k, v in data.items()},
-                }
-            elif isinstance(data, list):
-                if len(data) > 0:
-                    return {
-                        "type": "array",
-                        "length": len(data),
-                        "element_type": _extract_schema(data[0], depth + 1),
-                    }
-                return {"type": "array", "length": 0, "element_type": "unknown"}
-            elif isinstance(data, float):
-                return {"type": "float64"}
-            elif isinstance(data, int):
-                return {"type": "int"}
-            elif isinstance(data, bool):
-                return {"type": "bool"}
-            elif isinstance(data, str):
-                return {"type": "string"}
-            else:
-                return {"type": str(type(data).__name__)}
+    cached_by_type = _SCHEMA_BY_MSGTYPE.get(msg_type)
+    if cached_by_type is not None:
+        logger.debug("Cache hit: schema for msg_type %s", msg_type)
+        schema, sample_data = cached_by_type
+    else:
+        # Cache miss - sample one message and extract the schema
+        logger.debug("Cache miss: schema for %s", topic)
+        with handle.reader_ctx() as reader:
+            sample_data = None
+            for conn_iter, timestamp, rawdata in reader.messages(connections=connections):
+                msg = reader.deserialize(rawdata, conn_iter.msgtype)
+                sample_data = _flatten_msg(msg, conn_iter.msgtype)
+                break
 
         schema = _extract_schema(sample_data) if sample_data else {}
+        if sample_data is not None:
+            _SCHEMA_BY_MSGTYPE[msg_type] = (schema, sample_data)
 
-        result = {
-            "topic": topic,
-            "msg_type": msg_type,
-            "message_count": conn.msgcount,
-            "schema": schema,
-            "sample_data": sample_data,
-        }
+    result = {
+        "topic": topic,
+        "msg_type": msg_type,
+        "message_count": conn.msgcount,
+        "schema": schema,
+        "sample_data": sample_data,
+    }
 
-        # Cache the result
-        handle.meta[cache_key] = result
-        return result
+    # Cache the result
+    handle.meta[cache_key] = result
+    return result
 
 
 def get_topic_timestamps(topic: str, bag_path: str | None = None) -> list[float]:
@@ -431,27 +750,39 @@ def get_topic_timestamps(topic: str, bag_path: str | None = None) -> list[float]
     # Check if we have a cached index
     index = handle.get_or_build_index(topic)
     if index is not None:
-        logger.debug(f"Index hit: returning {len(index.timestamps_ns)} timestamps for {topic}")
-        return [t / 1e9 for t in index.timestamps_ns]
+        logger.debug("Index hit: returning %d timestamps for %s", len(index.timestamps_ns), topic)
+        return (np.asarray(index.timestamps_ns, dtype=np.int64) / 1e9).tolist()
 
     # No index - build one during scan
-    logger.debug(f"Index miss: building timestamps for {topic}")
-    timestamps = []
-    timestamps_ns = []
+    logger.debug("Index miss: building timestamps for %s", topic)
 
     with handle.reader_ctx() as reader:
-        connections = [c for c in reader.connections if c.topic == topic]
+        connections = handle.connections_for_topic(topic)
         if not connections:
             return []
 
-        for conn, timestamp, rawdata in reader.messages(connections=connections):
-            timestamps.append(timestamp / 1e9)
-            timestamps_ns.append(timestamp)
+        # Preallocate from the connection msgcounts so the scan only assigns
+        # by position — no per-stamp boxing (see TopicTimeIndex.from_reader).
+        expected = sum(c.msgcount or 0 for c in connections)
+        index = TopicTimeIndex.from_reader(reader, connections, expected)
 
         # Store index for future use
-        if timestamps_ns:
-            index = TopicTimeIndex(timestamps_ns=timestamps_ns)
+        if len(index.timestamps_ns):
             handle.store_index(topic, index)
-            logger.debug(f"Built and cached index for {topic}: {len(timestamps_ns)} timestamps")
+            logger.debug(
+                "Built and cached index for %s: %d timestamps", topic, len(index.timestamps_ns)
+            )
 
-        return timestamps
+        # One vectorized divide instead of a Python divide per timestamp
+        return (index.timestamps_ns / 1e9).tolist()
+
+
+def get_topic_message_count(topic: str, bag_path: str | None = None) -> int:
+    """Get the message count for a topic directly from the bag index.
+
+    Uses ``conn.msgcount`` from the connection metadata — no message
+    iteration or deserialization happens.
+    """
+    path = _resolve_path(bag_path)
+    handle = _cache.get_handle(path)
+    return sum(c.msgcount or 0 for c in handle.connections_for_topic(topic))
@@ -6,16 +6,22 @@ and topic timestamp indexing.
 
 from __future__ import annotations
 
-import bisect
+import array
+import heapq
 import logging
+import mmap
 import os
+import struct
+import threading
 import time
 from collections import OrderedDict
 from contextlib import contextmanager
 from dataclasses import dataclass, field
+from functools import lru_cache
 from pathlib import Path
 from typing import Any, Generator
 
+import numpy as np
 from rosbags.highlevel import AnyReader
 
 logger = logging.getLogger(__name__)
@@ -26,18 +32,30 @@ logger = logging.getLogger(__name__)
 # ---------------------------------------------------------------------------
 
 
-@dataclass(frozen=True)
+@dataclass(frozen=True, slots=True)
 class BagKey:
-    realpath: str
+    dev: int
+    ino: int
     size: int
     mtime_ns: int
 
 
+@lru_cache(maxsize=256)
+def _stat_path(path_str: str, bucket: int) -> BagKey:
+    st = os.stat(path_str)
+    return BagKey(dev=st.st_dev, ino=st.st_ino, size=st.st_size, mtime_ns=st.st_mtime_ns)
+
+
 def bag_key_for(path: str | Path) -> BagKey:
-    """Build a BagKey from a filesystem path (resolves symlinks)."""
-    rp = os.path.realpath(str(path))
-    st = os.stat(rp)
-    return BagKey(realpath=rp, size=st.st_size, mtime_ns=st.st_mtime_ns)
+    """Build a BagKey from a filesystem path.
+
+    Identity is (dev, ino, size, mtime_ns) from a single os.stat — symlinks
+    and hardlinks to the same file share one key without the lstat-per-
+    component cost of realpath.  The stat is memoized in one-second buckets:
+    repeated lookups of the same path within a bucket skip the syscall,
+    while a new bucket re-stats so on-disk changes are picked up promptly.
+    """
+    return _stat_path(str(path), int(time.monotonic()))
 
 
 # ---------------------------------------------------------------------------
@@ -45,36 +63,83 @@ def bag_key_for(path: str | Path) -> BagKey:
 # ---------------------------------------------------------------------------
 
 
-@dataclass
+@dataclass(slots=True)
 class TopicTimeIndex:
-    timestamps_ns: list[int] = field(default_factory=list)
+    """Sorted nanosecond timestamps, stored unboxed as an int64 ndarray.
+
+    Accepts a list, ``array.array('q')`` or ndarray — list input is converted
+    once at construction, so lookups always run on the compact 8-bytes-per-
+    stamp representation instead of a list of boxed PyLongs.
+    """
+
+    timestamps_ns: Any = field(default_factory=lambda: np.empty(0, dtype=np.int64))
+
+    def __post_init__(self) -> None:
+        if not isinstance(self.timestamps_ns, np.ndarray):
+            self.timestamps_ns = np.asarray(self.timestamps_ns, dtype=np.int64)
 
     @property
     def size_bytes(self) -> int:
-        # 8 bytes per int64 + list overhead
-        return len(self.timestamps_ns) * 8 + 56
+        return int(self.timestamps_ns.nbytes)
+
+    def to_bytes(self) -> bytes:
+        """Raw little-endian int64 stamps — ~20x cheaper than JSON ints.
+
+        Suitable for binary transport as ``{"encoding": "i8le", "data":
+        base64(...)}``; decode with :meth:`from_bytes`.
+        """
+        return np.ascontiguousarray(self.timestamps_ns, dtype="<i8").tobytes()
+
+    @classmethod
+    def from_bytes(cls, buf: bytes) -> TopicTimeIndex:
+        """Inverse of :meth:`to_bytes` (zero-copy view onto ``buf``)."""
+        return cls(timestamps_ns=np.frombuffer(buf, dtype="<i8"))
+
+    @classmethod
+    def from_reader(cls, reader: Any, connections: list[Any], count_hint: int) -> TopicTimeIndex:
+        """Build an index by scanning a reader, filling a preallocated array.
+
+        ``count_hint`` (from connection msgcounts) sizes an int64 buffer up
+        front so the scan assigns by position — no per-stamp PyLong boxing
+        or list growth.  A low hint spills into an overflow array; a high
+        hint is trimmed at the end.
+        """
+        arr = np.empty(count_hint, dtype=np.int64)
+        overflow = array.array("q")
+        i = 0
+        for _, timestamp, _ in reader.messages(connections=connections):
+            if i < count_hint:
+                arr[i] = timestamp
+            else:
+                overflow.append(timestamp)
+            i += 1
+        if overflow:
+            return cls(timestamps_ns=np.concatenate([arr, np.frombuffer(overflow, dtype=np.int64)]))
+        return cls(timestamps_ns=arr[:i] if i < count_hint else arr)
 
     def find_nearest(self, target_ns: int, tolerance_ns: int) -> int | None:
         """Return index of closest timestamp within tolerance, or None."""
         ts = self.timestamps_ns
-        if not ts:
+        n = len(ts)
+        if n == 0:
             return None
-        idx = bisect.bisect_left(ts, target_ns)
-        best_idx = None
-        best_diff = tolerance_ns + 1
-        for candidate in (idx - 1, idx):
-            if 0 <= candidate < len(ts):
-                diff = abs(ts[candidate] - target_ns)
-                if diff < best_diff:
-                    best_diff = diff
-                    best_idx = candidate
-        return best_idx if best_diff <= tolerance_ns else None
+        # Straight-line candidate selection: clamp the insertion point's two
+        # neighbours into range and pick the closer, no tuple/loop overhead.
+        idx = int(np.searchsorted(ts, target_ns, side="left"))
+        left = idx - 1
+        right = idx if idx < n else n - 1
+        if left < 0:
+            left = right
+        d_l = abs(int(ts[left]) - target_ns)
+        d_r = abs(int(ts[right]) - target_ns)
+        best, diff = (left, d_l) if d_l <= d_r else (right, d_r)
+        return best if diff <= tolerance_ns else None
 
     def find_range(self, start_ns: int, end_ns: int) -> tuple[int, int]:
         """Return (start_idx, end_idx) slice covering [start_ns, end_ns]."""
         ts = self.timestamps_ns
-        lo = bisect.bisect_left(ts, start_ns)
-        hi = bisect.bisect_right(ts, end_ns)
+        lo = int(np.searchsorted(ts, start_ns, side="left"))
+        hi = int(np.searchsorted(ts, end_ns, side="right"))
         return lo, hi
 
 
@@ -87,11 +152,80 @@ _DEFAULT_MAX_PER_TOPIC = 50 * 1024 * 1024  # 50 MB per topic
 _RAW_SIZE_GATE = 100_000  # 100 KB — skip caching if first message exceeds this
 
 
+@dataclass(slots=True)
+class CachedTopic:
+    """Columnar (SoA) storage for one cached topic.
+
+    The topic name and msg_type are stored once instead of once per message,
+    timestamps live in a single int64 array (8 bytes each, searchable with
+    ``np.searchsorted``), and message payloads are kept as raw CDR bytes —
+    far smaller than the nested dict tree they deserialize into.  ``data``
+    holds the flattened dict per message once it has been materialized on a
+    cache-hit read (None until then), so replays of a slice only pay
+    deserialize cost for that slice, exactly once.
+    """
+
+    topic: str
+    msg_type: str
+    timestamps_ns: np.ndarray
+    raw: list[bytes]
+    data: list[Any]
+
+    def __len__(self) -> int:
+        return len(self.raw)
+
+    def slice_range(self, start_ns: int | None, end_ns: int | None) -> tuple[int, int]:
+        """Return (lo, hi) indices covering [start_ns, end_ns] via binary search."""
+        lo = 0
+        hi = len(self.raw)
+        if start_ns is not None:
+            lo = int(np.searchsorted(self.timestamps_ns, start_ns, side="left"))
+        if end_ns is not None:
+            hi = int(np.searchsorted(self.timestamps_ns, end_ns, side="right"))
+        return lo, hi
+
+
+class _FrequencySketch:
+    """Small count-min sketch with periodic halving (TinyLFU-style aging).
+
+    Tracks approximate access frequency per topic so the cache can refuse
+    to evict a hot entry for a newcomer that was never seen before.
+    Counters saturate at 15 and are halved every ``age_every`` bumps.
+    """
+
+    def __init__(self, width: int = 2048, depth: int = 2, age_every: int = 2048) -> None:
+        self._width = width
+        self._tables = [bytearray(width) for _ in range(depth)]
+        self._age_every = age_every
+        self._ops = 0
+
+    def bump(self, key: str) -> None:
+        for i, table in enumerate(self._tables):
+            slot = hash((i, key)) % self._width
+            if table[slot] < 15:
+                table[slot] += 1
+        self._ops += 1
+        if self._ops >= self._age_every:
+            self._age()
+
+    def estimate(self, key: str) -> int:
+        return min(table[hash((i, key)) % self._width] for i, table in enumerate(self._tables))
+
+    def _age(self) -> None:
+        for table in self._tables:
+            for j in range(len(table)):
+                table[j] >>= 1
+        self._ops = 0
+
+
 class MessageCache:
     """Size-gated per-topic message cache.
 
-    Stores deserialized messages for topics whose raw payload is small enough.
-    Serves time-filtered queries via binary search on cached timestamps.
+    Stores messages columnar (see CachedTopic) for topics whose raw payload
+    is small enough.  Serves time-filtered queries via binary search on the
+    timestamp array.  Entries are kept in LRU order: reads promote a topic
+    to most-recently-used and commits evict from the LRU end until the new
+    entry fits the total budget.
     """
 
     def __init__(
@@ -101,82 +235,138 @@ class MessageCache:
     ) -> None:
         self.max_bytes = max_bytes
         self.max_per_topic = max_per_topic
-        self._topics: dict[str, list[Any]] = {}
+        self._topics: OrderedDict[str, CachedTopic] = OrderedDict()
         self._topic_bytes: dict[str, int] = {}
         self._total_bytes = 0
+        self._sketch = _FrequencySketch()
+        # Commits, evictions and LRU promotion are multi-step updates to the
+        # dicts and byte totals; tool handlers run on worker threads, so all
+        # of them go through this lock.
+        self._lock = threading.RLock()
 
     def has(self, topic: str) -> bool:
         return topic in self._topics
 
-    def can_cache(self, raw_msg_size: int, msg_count: int) -> bool:
+    def reserve(self, raw_msg_size: int, msg_count: int) -> int | None:
+        """Admission gate returning the byte budget available to a topic.
+
+        Folds the size gate and per-topic cap into one integer: callers
+        compare their running byte count against the returned budget instead
+        of re-deriving the caps per message.  Returns None when the first
+        message already rules caching out.  Total-budget pressure is not a
+        reason to refuse here — commit() evicts LRU entries (subject to the
+        frequency-sketch admission check) to make room, so a full cache can
+        still take on a hot newcomer.
+        """
         if raw_msg_size > _RAW_SIZE_GATE:
-            return False
-        estimated = raw_msg_size * msg_count
-        if estimated > self.max_per_topic:
-            return False
-        if self._total_bytes + estimated > self.max_bytes:
-            return False
-        return True
+            return None
+        if raw_msg_size * msg_count > self.max_per_topic:
+            return None
+        return self.max_per_topic
+
+    def can_cache(self, raw_msg_size: int, msg_count: int) -> bool:
+        return self.reserve(raw_msg_size, msg_count) is not None
 
     def budget_ok(self, collected_bytes: int) -> bool:
         if collected_bytes > self.max_per_topic:
             return False
-        if self._total_bytes + collected_bytes > self.max_bytes:
-            return False
-        return True
-
-    def commit(self, topic: str, messages: list[Any], bytes_used: int) -> None:
-        self._topics[topic] = messages
+        with self._lock:
+            return self._total_bytes + collected_bytes <= self.max_bytes
+
+    def commit(self, topic: str, entry: CachedTopic, bytes_used: int) -> None:
+        with self._lock:
+            self._commit_locked(topic, entry, bytes_used)
+
+    def _commit_locked(self, topic: str, entry: CachedTopic, bytes_used: int) -> None:
+        self._sketch.bump(topic)
+        old_bytes = self._topic_bytes.pop(topic, None)
+        if old_bytes is not None:
+            self._total_bytes -= old_bytes
+            del self._topics[topic]
+
+        # Admission gate: if making room means evicting, and the would-be
+        # victim is accessed more often than the newcomer, keep the victim.
+        if self._topics and self._total_bytes + bytes_used > self.max_bytes:
+            victim = next(iter(self._topics))
+            if self._sketch.estimate(topic) < self._sketch.estimate(victim):
+                logger.debug("Admission rejected for %s (colder than LRU victim %s)", topic, victim)
+                return
+
+        # Evict LRU entries until the new entry fits the total budget
+        while self._topics and self._total_bytes + bytes_used > self.max_bytes:
+            evicted, _ = self._topics.popitem(last=False)
+            self._total_bytes -= self._topic_bytes.pop(evicted, 0)
+            logger.debug("Evicted LRU cached topic: %s", evicted)
+
+        self._topics[topic] = entry
         self._topic_bytes[topic] = bytes_used
         self._total_bytes += bytes_used
         logger.debug(
             "Cached %d messages for %s (%.1f KB, total %.1f MB)",
-            len(messages),
+            len(entry),
             topic,
             bytes_used / 1024,
             self._total_bytes / (1024 * 1024),
         )
 
-    def get(self, topic: str) -> list[Any] | None:
-        return self._topics.get(topic)
+    def get(self, topic: str) -> CachedTopic | None:
+        with self._lock:
+            self._sketch.bump(topic)
+            entry = self._topics.get(topic)
+            if entry is not None:
+                self._topics.move_to_end(topic)
+            return entry
+
+    def get_range_view(
+        self, topic: str, start_ns: int | None, end_ns: int | None
+    ) -> tuple[CachedTopic, int, int] | None:
+        """Zero-copy variant of get_range: return (entry, lo, hi) bounds.
+
+        Callers index entry.timestamps_ns/raw/data within [lo, hi) directly,
+        avoiding the sliced-list allocations the copying form pays.
+        """
+        entry = self.get(topic)
+        if entry is None:
+            return None
+        lo, hi = entry.slice_range(start_ns, end_ns)
+        return entry, lo, hi
 
-    def get_range(self, topic: str, start_ns: int | None, end_ns: int | None) -> list[Any] | None:
-        msgs = self._topics.get(topic)
-        if msgs is None:
+    def get_range(self, topic: str, start_ns: int | None, end_ns: int | None) -> CachedTopic | None:
+        entry = self.get(topic)
+        if entry is None:
             return None
         if start_ns is None and end_ns is None:
-            return msgs
-
-        # Binary search using timestamp (stored as seconds in BagMessage)
-        start_sec = start_ns / 1e9 if start_ns else None
-        end_sec = end_ns / 1e9 if end_ns else None
-
-        lo = 0
-        hi = len(msgs)
-        if start_sec is not None:
-            lo = bisect.bisect_left([m.timestamp for m in msgs], start_sec)
-        if end_sec is not None:
-            hi = bisect.bisect_right([m.timestamp for m in msgs], end_sec)
-        return msgs[lo:hi]
+            return entry
+
+        lo, hi = entry.slice_range(start_ns, end_ns)
+        return CachedTopic(
+            topic=entry.topic,
+            msg_type=entry.msg_type,
+            timestamps_ns=entry.timestamps_ns[lo:hi],
+            raw=entry.raw[lo:hi],
+            data=entry.data[lo:hi],
+        )
 
     def clear(self) -> None:
-        self._topics.clear()
-        self._topic_bytes.clear()
-        self._total_bytes = 0
+        with self._lock:
+            self._topics.clear()
+            self._topic_bytes.clear()
+            self._total_bytes = 0
 
     @property
     def total_bytes(self) -> int:
         return self._total_bytes
 
     def stats(self) -> dict[str, Any]:
-        return {
-            "cached_topics": list(self._topics.keys()),
-            "total_bytes": self._total_bytes,
-            "per_topic": {
-                t: {"messages": len(m), "bytes": self._topic_bytes.get(t, 0)}
-                for t, m in self._topics.items()
-            },
-        }
+        with self._lock:
+            return {
+                "cached_topics": list(self._topics.keys()),
+                "total_bytes": self._total_bytes,
+                "per_topic": {
+                    t: {"messages": len(e), "bytes": self._topic_bytes.get(t, 0)}
+                    for t, e in self._topics.items()
+                },
+            }
 
 
 # ---------------------------------------------------------------------------
@@ -184,6 +374,19 @@ class MessageCache:
 # ---------------------------------------------------------------------------
 
 
+# Sidecar index file: persists topic timestamp indexes next to the bag so a
+# server restart doesn't have to re-scan the bag to rebuild them.  Layout:
+# header (magic, version, bag size, bag mtime_ns, topic count), then per
+# topic: name length, name, stamp count, raw int64 stamps.
+_SIDECAR_MAGIC = b"RBMCPIDX"
+_SIDECAR_VERSION = 1
+_SIDECAR_HEADER = "<8sIqqI"
+
+
+def _sidecar_path(bag_path: str) -> str:
+    return bag_path + ".rosbag-mcp-idx"
+
+
 class BagHandle:
     """Wraps a bag path with metadata caches.  Re-opens AnyReader on each scan."""
 
@@ -200,53 +403,167 @@ class BagHandle:
 
         self.message_cache = MessageCache()
 
-        # Cached connections info
+        # Cached connections info, plus a topic -> connections index so
+        # query paths don't re-scan the full list per lookup
         self._connections: list[Any] | None = None
+        self._conn_by_topic: dict[str, list[Any]] | None = None
+
+        # Pooled reader — opened lazily, closed when the handle is evicted.
+        # _reader_lock guards open/close and the in-use bookkeeping;
+        # _scan_lock is held for the whole of each reader_ctx because rosbags
+        # readers keep mutable scan state and cannot be iterated concurrently.
+        self._reader: AnyReader | None = None
+        self._reader_lock = threading.Lock()
+        self._scan_lock = threading.Lock()
+        self._reader_users = 0
+        self._close_pending = False
+
+        self._load_sidecar()
+
+    def _load_sidecar(self) -> None:
+        """Load persisted topic indexes if the sidecar matches this bag."""
+        try:
+            with open(_sidecar_path(self.path), "rb") as f:
+                mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        except (OSError, ValueError):
+            return
+        try:
+            magic, version, size, mtime_ns, ntopics = struct.unpack_from(_SIDECAR_HEADER, mm, 0)
+            if magic != _SIDECAR_MAGIC or version != _SIDECAR_VERSION:
+                return
+            if size != self.key.size or mtime_ns != self.key.mtime_ns:
+                return
+            off = struct.calcsize(_SIDECAR_HEADER)
+            for _ in range(ntopics):
+                (name_len,) = struct.unpack_from("<I", mm, off)
+                off += 4
+                name = mm[off : off + name_len].decode()
+                off += name_len
+                (count,) = struct.unpack_from("<q", mm, off)
+                off += 8
+                # Zero-copy view onto the mapped file
+                stamps = np.frombuffer(mm, dtype=np.int64, count=count, offset=off)
+                off += count * 8
+                self.topic_indexes[name] = TopicTimeIndex(timestamps_ns=stamps)
+            logger.debug(
+                "Loaded %d topic indexes from sidecar for %s", len(self.topic_indexes), self.path
+            )
+        except (struct.error, ValueError, UnicodeDecodeError):
+            self.topic_indexes.clear()
+
+    def _save_sidecar(self) -> None:
+        """Atomically persist the current topic indexes next to the bag."""
+        sidecar = _sidecar_path(self.path)
+        tmp = sidecar + ".tmp"
+        try:
+            with open(tmp, "wb") as f:
+                f.write(
+                    struct.pack(
+                        _SIDECAR_HEADER,
+                        _SIDECAR_MAGIC,
+                        _SIDECAR_VERSION,
+                        self.key.size,
+                        self.key.mtime_ns,
+                        len(self.topic_indexes),
+                    )
+                )
+                for name, index in self.topic_indexes.items():
+                    encoded = name.encode()
+                    stamps = np.ascontiguousarray(index.timestamps_ns, dtype=np.int64)
+                    f.write(struct.pack("<I", len(encoded)))
+                    f.write(encoded)
+                    f.write(struct.pack("<q", len(stamps)))
+                    f.write(stamps.tobytes())
+            os.replace(tmp, sidecar)
+        except OSError:
+            # Read-only bag directory etc. — the in-process cache still works
+            logger.debug("Could not write index sidecar for %s", self.path)
 
     def touch(self) -> None:
         self.last_used = time.monotonic()
 
     def open_reader(self) -> AnyReader:
-        """Create and enter a new AnyReader context for iteration."""
-        reader = AnyReader([Path(self.path)])
-        reader.__enter__()
-        # Cache connections on first open
-        if self._connections is None:
-            self._connections = list(reader.connections)
-        return reader
+        """Return the pooled long-lived AnyReader, opening it on first use.
 
-    @staticmethod
-    def close_reader(reader: AnyReader) -> None:
-        """Exit reader context."""
-        try:
-            reader.__exit__(None, None, None)
-        except Exception:
-            pass
+        Opening an MCAP/SQLite3 bag parses headers and loads indexes; the
+        reader is kept open for the handle's lifetime so repeated small
+        queries don't pay that cost per scan.
+        """
+        with self._reader_lock:
+            if self._reader is None:
+                reader = AnyReader([Path(self.path)])
+                reader.__enter__()
+                self._reader = reader
+                # Cache connections on first open
+                if self._connections is None:
+                    self._connections = list(reader.connections)
+            return self._reader
+
+    def close(self) -> None:
+        """Close the pooled reader (eviction/invalidation path).
+
+        If a scan is mid-iteration on another thread, the close is deferred
+        and performed by that scan when it finishes, so the reader's files
+        are never pulled out from under a live iteration.
+        """
+        with self._reader_lock:
+            if self._reader_users:
+                self._close_pending = True
+                return
+            self._close_reader_locked()
+
+    def _close_reader_locked(self) -> None:
+        """Close the reader; caller holds ``_reader_lock``."""
+        self._close_pending = False
+        if self._reader is not None:
+            try:
+                self._reader.__exit__(None, None, None)
+            except Exception:
+                pass
+            self._reader = None
 
     @property
     def connections(self) -> list[Any]:
-        """Get connection list (opens reader briefly if needed)."""
+        """Get connection list (opens the pooled reader if needed)."""
         if self._connections is None:
-            reader = self.open_reader()
-            self._connections = list(reader.connections)
-            self.close_reader(reader)
+            self._connections = list(self.open_reader().connections)
         return self._connections
 
+    def connections_for_topic(self, topic: str) -> list[Any]:
+        """O(1) topic lookup against a once-built topic->connections index."""
+        if self._conn_by_topic is None:
+            by_topic: dict[str, list[Any]] = {}
+            for conn in self.connections:
+                by_topic.setdefault(conn.topic, []).append(conn)
+            self._conn_by_topic = by_topic
+        return self._conn_by_topic.get(topic, [])
+
     @contextmanager
     def reader_ctx(self) -> Generator[AnyReader, None, None]:
-        """Context manager for safe reader lifecycle.
+        """Context manager yielding the pooled reader.
 
         Usage::
 
             with handle.reader_ctx() as reader:
                 for conn, ts, raw in reader.messages():
                     ...
+
+        Scans are serialized on a per-handle lock for the whole context —
+        rosbags readers mutate shared chunk state while iterating, so two
+        worker threads must never drive one reader at once. The reader stays
+        open on exit; it is closed when the handle is evicted or invalidated,
+        deferred past any iteration still in flight.
         """
-        reader = self.open_reader()
-        try:
-            yield reader
-        finally:
-            self.close_reader(reader)
+        with self._scan_lock:
+            with self._reader_lock:
+                self._reader_users += 1
+            try:
+                yield self.open_reader()
+            finally:
+                with self._reader_lock:
+                    self._reader_users -= 1
+                    if self._close_pending and not self._reader_users:
+                        self._close_reader_locked()
 
     def get_or_build_index(self, topic: str) -> TopicTimeIndex | None:
         """Return cached topic index, or None if not yet built."""
@@ -254,6 +571,7 @@ class BagHandle:
 
     def store_index(self, topic: str, index: TopicTimeIndex) -> None:
         self.topic_indexes[topic] = index
+        self._save_sidecar()
         logger.debug(
             "Cached time index for %s: %d timestamps (%.1f KB)",
             topic,
@@ -278,60 +596,87 @@ class BagCacheManager:
         self.max_open = max_open
         self.idle_ttl_s = idle_ttl_s
         self._handles: OrderedDict[BagKey, BagHandle] = OrderedDict()
+        # Secondary index: (dev, ino) -> current key, for O(1) detection of
+        # a bag that changed on disk (no linear scan per cache miss)
+        self._by_inode: dict[tuple[int, int], BagKey] = {}
+        # Negative stat cache: path -> monotonic time it was seen missing,
+        # so polling a just-deleted bag doesn't re-stat every call
+        self._missing: dict[str, float] = {}
+        # (last_used, key) min-heap for idle eviction; entries go stale when
+        # a handle is touched and are skipped lazily on pop
+        self._idle_heap: list[tuple[float, BagKey]] = []
+        # Concurrent MCP calls race on move_to_end/popitem without this
+        self._lock = threading.RLock()
 
     def get_handle(self, bag_path: str) -> BagHandle:
         """Get or create a BagHandle for the given path."""
         bag_path = os.path.expanduser(bag_path)
         key = bag_key_for(bag_path)
 
-        # Check existing handle — validate key hasn't changed
-        handle = self._handles.get(key)
-        if handle is not None:
-            handle.touch()
-            self._handles.move_to_end(key)
-            return handle
-
-        # Check if same realpath exists under a stale key (file changed)
-        for old_key in list(self._handles):
-            if old_key.realpath == key.realpath and old_key != key:
+        with self._lock:
+            # Check existing handle — validate key hasn't changed
+            handle = self._handles.get(key)
+            if handle is not None:
+                handle.touch()
+                heapq.heappush(self._idle_heap, (handle.last_used, key))
+                self._handles.move_to_end(key)
+                return handle
+
+            # Check if the same inode exists under a stale key (file changed)
+            old_key = self._by_inode.get((key.dev, key.ino))
+            if old_key is not None and old_key != key:
                 logger.info("Bag file changed on disk, invalidating cache: %s", bag_path)
                 self._close_handle(old_key)
-                break
-
-        # Evict idle handles
-        self._evict_idle()
 
-        # Evict LRU if at capacity
-        while len(self._handles) >= self.max_open:
-            oldest_key = next(iter(self._handles))
-            logger.debug("Evicting LRU bag handle: %s", oldest_key.realpath)
-            self._close_handle(oldest_key)
-
-        # Create new handle
-        handle = BagHandle(key, bag_path)
-        self._handles[key] = handle
-        logger.info("Opened bag handle: %s", bag_path)
-        return handle
+            # Evict idle handles
+            self._evict_idle()
+
+            # Evict LRU if at capacity — popitem(last=False) is a C-level FIFO
+            # pop, no fresh iterator allocation per evicted entry
+            while len(self._handles) >= self.max_open:
+                _, oldest = self._handles.popitem(last=False)
+                oldest.close()
+                oldest.message_cache.clear()
+                self._by_inode.pop((oldest.key.dev, oldest.key.ino), None)
+                logger.debug("Evicting LRU bag handle: %s", oldest.path)
+
+            # Create new handle
+            handle = BagHandle(key, bag_path)
+            self._handles[key] = handle
+            self._by_inode[(key.dev, key.ino)] = key
+            heapq.heappush(self._idle_heap, (handle.last_used, key))
+            logger.info("Opened bag handle: %s", bag_path)
+            return handle
 
     def invalidate(self, bag_path: str) -> None:
         """Close and remove handle for a specific path."""
         bag_path = os.path.expanduser(bag_path)
-        try:
-            key = bag_key_for(bag_path)
-            self._close_handle(key)
-        except (FileNotFoundError, OSError):
-            pass
+        with self._lock:
+            if time.monotonic() - self._missing.get(bag_path, -1.0) < 1.0:
+                return
+            try:
+                key = bag_key_for(bag_path)
+                self._close_handle(key)
+            except (FileNotFoundError, OSError):
+                if len(self._missing) >= 64:
+                    self._missing.clear()
+                self._missing[bag_path] = time.monotonic()
 
     def clear(self) -> None:
         """Close all handles and clear caches."""
-        for key in list(self._handles):
-            self._close_handle(key)
+        with self._lock:
+            for key in list(self._handles):
+                self._close_handle(key)
         logger.info("Cleared all bag handles")
 
     def stats(self) -> dict[str, Any]:
         """Return cache statistics."""
+        # Snapshot under the lock, format outside it
+        with self._lock:
+            handles = list(self._handles.values())
+            open_count = len(handles)
         return {
-            "open_handles": len(self._handles),
+            "open_handles": open_count,
             "max_open": self.max_open,
             "bags": [
                 {
@@ -341,19 +686,28 @@ class BagCacheManager:
                     "message_cache": h.message_cache.stats(),
                     "idle_s": round(time.monotonic() - h.last_used, 1),
                 }
-                for h in self._handles.values()
+                for h in handles
             ],
         }
 
     def _close_handle(self, key: BagKey) -> None:
         handle = self._handles.pop(key, None)
         if handle is not None:
+            handle.close()
             handle.message_cache.clear()
+            if self._by_inode.get((key.dev, key.ino)) == key:
+                del self._by_inode[(key.dev, key.ino)]
             logger.debug("Closed bag handle: %s", handle.path)
 
     def _evict_idle(self) -> None:
+        # Lazy-deletion heap: only entries old enough to possibly be idle are
+        # popped; ones invalidated by a later touch are skipped.
         now = time.monotonic()
-        to_close = [k for k, h in self._handles.items() if (now - h.last_used) >= self.idle_ttl_s]
-        for k in to_close:
-            logger.debug("Evicting idle bag handle: %s", k.realpath)
-            self._close_handle(k)
+        heap = self._idle_heap
+        while heap and now - heap[0][0] >= self.idle_ttl_s:
+            ts, key = heapq.heappop(heap)
+            handle = self._handles.get(key)
+            if handle is None or handle.last_used != ts:
+                continue  # stale entry: handle closed or touched since
+            logger.debug("Evicting idle bag handle: %s", handle.path)
+            self._close_handle(key)
@@ -1,51 +1,38 @@
 from __future__ import annotations
 
 import asyncio
+import importlib
+import json
 import logging
+import os
+import sys
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+from types import MappingProxyType
+from typing import Any, Callable
 
 from mcp.server import Server
 from mcp.server.stdio import stdio_server
 from mcp.types import ImageContent, TextContent, Tool
 
-from rosbag_mcp.tools import (
-    analyze_costmap_violations,
-    analyze_diagnostics,
-    analyze_imu,
-    analyze_joint_states,
-    analyze_lidar_scan,
-    analyze_lidar_timeseries,
-    analyze_logs,
-    analyze_mcl_divergence,
-    analyze_navigation_health,
-    analyze_path_tracking,
-    analyze_pointcloud2,
-    analyze_topic_stats,
-    analyze_trajectory,
-    analyze_wheel_slip,
-    bag_info,
-    compare_topics,
-    detect_events,
-    export_to_csv,
-    filter_bag,
-    get_image_at_time,
-    get_message_at_time,
-    get_messages_in_range,
-    get_tf_tree,
-    get_topic_schema,
-    list_bags,
-    plot_2d,
-    plot_comparison,
-    plot_lidar_scan,
-    plot_timeseries,
-    search_messages,
-    set_bag_path,
-)
+try:
+    import orjson
+except ImportError:  # optional 'fast' extra
+    orjson = None
 
 logger = logging.getLogger(__name__)
 
 server = Server("rosbag-mcp")
 
-TOOL_DEFINITIONS = [
+# Shared schema fragments: the same read-only dict object is referenced from
+# every tool that declares the property, instead of dozens of identical
+# literals. MCP never mutates input schemas, so no copies are needed.
+_BAG_PATH_PROP = {"type": "string", "description": "Optional: specific bag file"}
+_TOPIC_PROP = {"type": "string", "description": "ROS topic name"}
+_START_TIME_PROP = {"type": "number", "description": "Optional: start time"}
+_END_TIME_PROP = {"type": "number", "description": "Optional: end time"}
+
+TOOL_DEFINITIONS = (
     Tool(
         name="set_bag_path",
         description="Set the path to a rosbag file or directory containing rosbags",
@@ -88,15 +75,29 @@ TOOL_DEFINITIONS = [
             "required": [],
         },
     ),
+    Tool(
+        name="close_bag",
+        description="Evict the cached reader and indexes for a bag file",
+        inputSchema={
+            "type": "object",
+            "properties": {
+                "bag_path": {
+                    "type": "string",
+                    "description": "Optional: specific bag file (uses current if not specified)",
+                }
+            },
+            "required": [],
+        },
+    ),
     Tool(
         name="get_message_at_time",
         description="Get message from a topic at a specific timestamp",
         inputSchema={
             "type": "object",
             "properties": {
-                "topic": {"type": "string", "description": "ROS topic name"},
+                "topic": _TOPIC_PROP,
                 "timestamp": {"type": "number", "description": "Unix timestamp in seconds"},
-                "bag_path": {"type": "string", "description": "Optional: specific bag file"},
+                "bag_path": _BAG_PATH_PROP,
                 "tolerance": {
                     "type": "number",
                     "description": "Time tolerance in seconds (default: 0.1)",
@@ -111,7 +112,7 @@ TOOL_DEFINITIONS = [
         inputSchema={
             "type": "object",
             "properties": {
-                "topic": {"type": "string", "description": "ROS topic name"},
+                "topic": _TOPIC_PROP,
                 "start_time": {
                     "type": "number",
                     "description": "Start unix timestamp in seconds",
@@ -121,7 +122,7 @@ TOOL_DEFINITIONS = [
                     "type": "integer",
                     "description": "Maximum messages to return (default: 100)",
                 },
-                "bag_path": {"type": "string", "description": "Optional: specific bag file"},
+                "bag_path": _BAG_PATH_PROP,
             },
             "required": ["topic", "start_time", "end_time"],
         },
@@ -132,7 +133,7 @@ TOOL_DEFINITIONS = [
         inputSchema={
             "type": "object",
             "properties": {
-                "topic": {"type": "string", "description": "ROS topic name"},
+                "topic": _TOPIC_PROP,
                 "condition_type": {
                     "type": "string",
                     "description": "Type: regex, equals, contains, field_exists, greater_than, less_than, near_position",
@@ -146,7 +147,7 @@ TOOL_DEFINITIONS = [
                     "type": "integer",
                     "description": "Maximum results (default: 10)",
                 },
-                "bag_path": {"type": "string", "description": "Optional: specific bag file"},
+                "bag_path": _BAG_PATH_PROP,
                 "correlate_topic": {
                     "type": "string",
                     "description": "Optional: topic to correlate with matches",
@@ -199,9 +200,9 @@ TOOL_DEFINITIONS = [
                     "type": "number",
                     "description": "High-uncertainty warning threshold in meters (default: 0.25)",
                 },
-                "start_time": {"type": "number", "description": "Optional: start time"},
-                "end_time": {"type": "number", "description": "Optional: end time"},
-                "bag_path": {"type": "string", "description": "Optional: specific bag file"},
+                "start_time": _START_TIME_PROP,
+                "end_time": _END_TIME_PROP,
+                "bag_path": _BAG_PATH_PROP,
             },
             "required": [],
         },
@@ -216,8 +217,8 @@ TOOL_DEFINITIONS = [
                     "type": "string",
                     "description": "Pose topic (default: /odom)",
                 },
-                "start_time": {"type": "number", "description": "Optional: start time"},
-                "end_time": {"type": "number", "description": "Optional: end time"},
+                "start_time": _START_TIME_PROP,
+                "end_time": _END_TIME_PROP,
                 "include_waypoints": {
                     "type": "boolean",
                     "description": "Include waypoints (default: false)",
@@ -226,7 +227,7 @@ TOOL_DEFINITIONS = [
                     "type": "number",
                     "description": "Heading change threshold in degrees for waypoints (default: 15.0)",
                 },
-                "bag_path": {"type": "string", "description": "Optional: specific bag file"},
+                "bag_path": _BAG_PATH_PROP,
             },
             "required": [],
         },
@@ -249,7 +250,7 @@ TOOL_DEFINITIONS = [
                     "type": "number",
                     "description": "Distance threshold for obstacles in meters (default: 1.0)",
                 },
-                "bag_path": {"type": "string", "description": "Optional: specific bag file"},
+                "bag_path": _BAG_PATH_PROP,
             },
             "required": [],
         },
@@ -271,7 +272,7 @@ TOOL_DEFINITIONS = [
                     "type": "integer",
                     "description": "Maximum logs to return (default: 50)",
                 },
-                "bag_path": {"type": "string", "description": "Optional: specific bag file"},
+                "bag_path": _BAG_PATH_PROP,
             },
             "required": [],
         },
@@ -281,9 +282,7 @@ TOOL_DEFINITIONS = [
         description="Get TF tree of coordinate frame relationships",
         inputSchema={
             "type": "object",
-            "properties": {
-                "bag_path": {"type": "string", "description": "Optional: specific bag file"}
-            },
+            "properties": {"bag_path": _BAG_PATH_PROP},
             "required": [],
         },
     ),
@@ -295,7 +294,7 @@ TOOL_DEFINITIONS = [
             "properties": {
                 "image_topic": {"type": "string", "description": "Image topic name"},
                 "timestamp": {"type": "number", "description": "Unix timestamp in seconds"},
-                "bag_path": {"type": "string", "description": "Optional: specific bag file"},
+                "bag_path": _BAG_PATH_PROP,
                 "max_size": {
                     "type": "integer",
                     "description": "Maximum image dimension (default: 1024)",
@@ -319,10 +318,10 @@ TOOL_DEFINITIONS = [
                     "items": {"type": "string"},
                     "description": "Fields to plot (e.g., ['odom.twist.twist.linear.x', 'cmd_vel.linear.x'])",
                 },
-                "start_time": {"type": "number", "description": "Optional: start time"},
-                "end_time": {"type": "number", "description": "Optional: end time"},
+                "start_time": _START_TIME_PROP,
+                "end_time": _END_TIME_PROP,
                 "title": {"type": "string", "description": "Plot title"},
-                "bag_path": {"type": "string", "description": "Optional: specific bag file"},
+                "bag_path": _BAG_PATH_PROP,
             },
             "required": ["fields"],
         },
@@ -337,10 +336,10 @@ TOOL_DEFINITIONS = [
                     "type": "string",
                     "description": "Topic with pose/odometry data (default: /odom)",
                 },
-                "start_time": {"type": "number", "description": "Optional: start time"},
-                "end_time": {"type": "number", "description": "Optional: end time"},
+                "start_time": _START_TIME_PROP,
+                "end_time": _END_TIME_PROP,
                 "title": {"type": "string", "description": "Plot title"},
-                "bag_path": {"type": "string", "description": "Optional: specific bag file"},
+                "bag_path": _BAG_PATH_PROP,
             },
             "required": [],
         },
@@ -357,7 +356,7 @@ TOOL_DEFINITIONS = [
                 },
                 "timestamp": {"type": "number", "description": "Timestamp to visualize"},
                 "title": {"type": "string", "description": "Plot title"},
-                "bag_path": {"type": "string", "description": "Optional: specific bag file"},
+                "bag_path": _BAG_PATH_PROP,
             },
             "required": ["timestamp"],
         },
@@ -368,8 +367,8 @@ TOOL_DEFINITIONS = [
         inputSchema={
             "type": "object",
             "properties": {
-                "topic": {"type": "string", "description": "ROS topic name"},
-                "bag_path": {"type": "string", "description": "Optional: specific bag file"},
+                "topic": _TOPIC_PROP,
+                "bag_path": _BAG_PATH_PROP,
             },
             "required": ["topic"],
         },
@@ -384,9 +383,9 @@ TOOL_DEFINITIONS = [
                     "type": "string",
                     "description": "IMU topic (default: /imu)",
                 },
-                "start_time": {"type": "number", "description": "Optional: start time"},
-                "end_time": {"type": "number", "description": "Optional: end time"},
-                "bag_path": {"type": "string", "description": "Optional: specific bag file"},
+                "start_time": _START_TIME_PROP,
+                "end_time": _END_TIME_PROP,
+                "bag_path": _BAG_PATH_PROP,
             },
             "required": [],
         },
@@ -397,8 +396,8 @@ TOOL_DEFINITIONS = [
         inputSchema={
             "type": "object",
             "properties": {
-                "topic": {"type": "string", "description": "ROS topic name"},
-                "bag_path": {"type": "string", "description": "Optional: specific bag file"},
+                "topic": _TOPIC_PROP,
+                "bag_path": _BAG_PATH_PROP,
             },
             "required": ["topic"],
         },
@@ -419,9 +418,9 @@ TOOL_DEFINITIONS = [
                     "type": "string",
                     "description": "Field path in second topic",
                 },
-                "start_time": {"type": "number", "description": "Optional: start time"},
-                "end_time": {"type": "number", "description": "Optional: end time"},
-                "bag_path": {"type": "string", "description": "Optional: specific bag file"},
+                "start_time": _START_TIME_PROP,
+                "end_time": _END_TIME_PROP,
+                "bag_path": _BAG_PATH_PROP,
             },
             "required": ["topic1", "topic2", "field1", "field2"],
         },
@@ -432,20 +431,20 @@ TOOL_DEFINITIONS = [
         inputSchema={
             "type": "object",
             "properties": {
-                "topic": {"type": "string", "description": "ROS topic name"},
+                "topic": _TOPIC_PROP,
                 "output_path": {"type": "string", "description": "Output CSV file path"},
                 "fields": {
                     "type": "array",
                     "items": {"type": "string"},
                     "description": "Optional: specific fields to export (exports all if not specified)",
                 },
-                "start_time": {"type": "number", "description": "Optional: start time"},
-                "end_time": {"type": "number", "description": "Optional: end time"},
+                "start_time": _START_TIME_PROP,
+                "end_time": _END_TIME_PROP,
                 "max_messages": {
                     "type": "integer",
                     "description": "Maximum messages to export (default: 10000)",
                 },
-                "bag_path": {"type": "string", "description": "Optional: specific bag file"},
+                "bag_path": _BAG_PATH_PROP,
             },
             "required": ["topic", "output_path"],
         },
@@ -456,7 +455,7 @@ TOOL_DEFINITIONS = [
         inputSchema={
             "type": "object",
             "properties": {
-                "topic": {"type": "string", "description": "ROS topic name"},
+                "topic": _TOPIC_PROP,
                 "field": {"type": "string", "description": "Field path to analyze"},
                 "event_type": {
                     "type": "string",
@@ -477,7 +476,7 @@ TOOL_DEFINITIONS = [
                     "type": "integer",
                     "description": "Window size for detection (default: 10)",
                 },
-                "bag_path": {"type": "string", "description": "Optional: specific bag file"},
+                "bag_path": _BAG_PATH_PROP,
             },
             "required": ["topic", "field"],
         },
@@ -500,7 +499,7 @@ TOOL_DEFINITIONS = [
                     "type": "integer",
                     "description": "Cost threshold for violation (default: 253, lethal=254-255)",
                 },
-                "bag_path": {"type": "string", "description": "Optional: specific bag file"},
+                "bag_path": _BAG_PATH_PROP,
             },
             "required": [],
         },
@@ -519,9 +518,9 @@ TOOL_DEFINITIONS = [
                     "type": "string",
                     "description": "Pose topic (default: /amcl_pose). Supports Odometry or PoseWithCovarianceStamped",
                 },
-                "start_time": {"type": "number", "description": "Optional: start time"},
-                "end_time": {"type": "number", "description": "Optional: end time"},
-                "bag_path": {"type": "string", "description": "Optional: specific bag file"},
+                "start_time": _START_TIME_PROP,
+                "end_time": _END_TIME_PROP,
+                "bag_path": _BAG_PATH_PROP,
             },
             "required": [],
         },
@@ -552,9 +551,9 @@ TOOL_DEFINITIONS = [
                     "type": "number",
                     "description": "Minimum difference to consider as slip in m/s (default: 0.1)",
                 },
-                "start_time": {"type": "number", "description": "Optional: start time"},
-                "end_time": {"type": "number", "description": "Optional: end time"},
-                "bag_path": {"type": "string", "description": "Optional: specific bag file"},
+                "start_time": _START_TIME_PROP,
+                "end_time": _END_TIME_PROP,
+                "bag_path": _BAG_PATH_PROP,
             },
             "required": [],
         },
@@ -581,7 +580,7 @@ TOOL_DEFINITIONS = [
                     "type": "string",
                     "description": "Navigation status topic (default: /move_base/navigation_status)",
                 },
-                "bag_path": {"type": "string", "description": "Optional: specific bag file"},
+                "bag_path": _BAG_PATH_PROP,
             },
             "required": [],
         },
@@ -604,9 +603,9 @@ TOOL_DEFINITIONS = [
                     "type": "integer",
                     "description": "Sample every Nth scan to reduce data (default: 1)",
                 },
-                "start_time": {"type": "number", "description": "Optional: start time"},
-                "end_time": {"type": "number", "description": "Optional: end time"},
-                "bag_path": {"type": "string", "description": "Optional: specific bag file"},
+                "start_time": _START_TIME_PROP,
+                "end_time": _END_TIME_PROP,
+                "bag_path": _BAG_PATH_PROP,
             },
             "required": [],
         },
@@ -627,13 +626,13 @@ TOOL_DEFINITIONS = [
                     "type": "string",
                     "description": "Field path in second topic",
                 },
-                "start_time": {"type": "number", "description": "Optional: start time"},
-                "end_time": {"type": "number", "description": "Optional: end time"},
+                "start_time": _START_TIME_PROP,
+                "end_time": _END_TIME_PROP,
                 "title": {
                     "type": "string",
                     "description": "Plot title (default: Topic Comparison)",
                 },
-                "bag_path": {"type": "string", "description": "Optional: specific bag file"},
+                "bag_path": _BAG_PATH_PROP,
             },
             "required": ["topic1", "topic2", "field1", "field2"],
         },
@@ -656,7 +655,7 @@ TOOL_DEFINITIONS = [
                     "type": "integer",
                     "description": "Maximum points to analyze (default: 10000)",
                 },
-                "bag_path": {"type": "string", "description": "Optional: specific bag file"},
+                "bag_path": _BAG_PATH_PROP,
             },
             "required": [],
         },
@@ -671,9 +670,9 @@ TOOL_DEFINITIONS = [
                     "type": "string",
                     "description": "JointState topic (default: /joint_states)",
                 },
-                "start_time": {"type": "number", "description": "Optional: start time"},
-                "end_time": {"type": "number", "description": "Optional: end time"},
-                "bag_path": {"type": "string", "description": "Optional: specific bag file"},
+                "start_time": _START_TIME_PROP,
+                "end_time": _END_TIME_PROP,
+                "bag_path": _BAG_PATH_PROP,
             },
             "required": [],
         },
@@ -688,236 +687,286 @@ TOOL_DEFINITIONS = [
                     "type": "string",
                     "description": "Diagnostics topic (default: /diagnostics)",
                 },
-                "start_time": {"type": "number", "description": "Optional: start time"},
-                "end_time": {"type": "number", "description": "Optional: end time"},
-                "bag_path": {"type": "string", "description": "Optional: specific bag file"},
+                "start_time": _START_TIME_PROP,
+                "end_time": _END_TIME_PROP,
+                "bag_path": _BAG_PATH_PROP,
             },
             "required": [],
         },
     ),
-]
+    Tool(
+        name="batch_execute",
+        description="Execute multiple tool calls in one request and return per-call results",
+        inputSchema={
+            "type": "object",
+            "properties": {
+                "calls": {
+                    "type": "array",
+                    "description": "Tool calls to run, each {name, arguments}",
+                    "items": {
+                        "type": "object",
+                        "properties": {
+                            "name": {"type": "string", "description": "Tool name"},
+                            "arguments": {"type": "object", "description": "Tool arguments"},
+                        },
+                        "required": ["name"],
+                    },
+                },
+                "max_concurrent": {
+                    "type": "integer",
+                    "description": "Maximum sub-calls in flight at once (default: 8)",
+                },
+                "stop_on_error": {
+                    "type": "boolean",
+                    "description": (
+                        "Skip remaining sub-calls after the first failure (default: false)"
+                    ),
+                },
+            },
+            "required": ["calls"],
+        },
+    ),
+)
+
+# list_tools serves the same immutable catalogue on every call, so its JSON
+# form is computed once at import instead of re-walking 31 Pydantic models.
+_TOOL_LIST_JSON: bytes = (
+    orjson.dumps([t.model_dump(mode="json") for t in TOOL_DEFINITIONS])
+    if orjson is not None
+    else json.dumps([t.model_dump(mode="json") for t in TOOL_DEFINITIONS]).encode()
+)
+
+
+def raw_list_tools_response() -> bytes:
+    """Pre-serialized ``list_tools`` payload for transports that accept bytes."""
+    return _TOOL_LIST_JSON
+
+
+_TOOL_IMPL_CACHE: dict[str, Callable] = {}
+
+
+def _resolve(name: str) -> Callable:
+    """Import a tool implementation on first use and memoize it.
 
+    Tool submodules are loaded lazily (see ``tools.__getattr__``) so a stdio
+    spawn that never plots never imports matplotlib.
+    """
+    func = _TOOL_IMPL_CACHE.get(name)
+    if func is None:
+        tools = importlib.import_module("rosbag_mcp.tools")
+        func = _TOOL_IMPL_CACHE[name] = getattr(tools, name)
+    return func
+
+
+_JSON_TYPE_TO_PY = {
+    "string": str,
+    "number": float,
+    "integer": int,
+    "boolean": bool,
+    "array": list,
+    "object": dict,
+}
+
+_ARG_MODELS: dict[str, Any] = {}
+
+
+def _build_arg_model(name: str) -> Any:
+    """Build a pydantic model for one tool's arguments from its inputSchema."""
+    from pydantic import create_model
+
+    schema = next(t.inputSchema for t in TOOL_DEFINITIONS if t.name == name)
+    required = frozenset(schema.get("required", ()))
+    fields: dict[str, Any] = {}
+    for prop, fragment in schema.get("properties", {}).items():
+        py_type = _JSON_TYPE_TO_PY.get(fragment.get("type"), Any)
+        if prop in required:
+            fields[prop] = (py_type, ...)
+        else:
+            fields[prop] = (py_type | None if py_type is not Any else Any, None)
+    return create_model(f"_{name}_args", **fields)
+
+
+def _validate_args(name: str, args: dict) -> None:
+    """Validate args against the tool's schema, raising a descriptive error.
+
+    Only runs on the error path: the compiled handlers unpack args directly,
+    and fall back here when a required key is missing so the caller gets a
+    field-by-field validation message instead of a bare KeyError. Models are
+    built lazily to keep them off the import path.
+    """
+    model = _ARG_MODELS.get(name)
+    if model is None:
+        model = _ARG_MODELS[name] = _build_arg_model(name)
+    model.model_validate(args)
+
+
+def _compile_handler(name: str, schema: dict) -> Callable:
+    """Compile a specialized ``def`` that unpacks args straight into the tool.
+
+    Required and optional argument names come from the tool's inputSchema, so
+    the schema is the single source of truth for dispatch. Optional args are
+    forwarded only when the caller supplied them, letting the tool function's
+    own signature defaults apply. Missing required args divert through
+    _validate_args for a usable error message.
+    """
+    required = schema.get("required", ())
+    optional = [p for p in schema.get("properties", {}) if p not in required]
+    lines = [f"def _h_{name}(a):", "    try:"]
+    binds = ", ".join(f"{p!r}: a[{p!r}]" for p in required)
+    lines.append(f"        kw = {{{binds}}}")
+    lines.append("    except KeyError:")
+    lines.append(f"        _validate_args({name!r}, a)")
+    lines.append("        raise")
+    for p in optional:
+        lines.append(f"    if {p!r} in a:")
+        lines.append(f"        kw[{p!r}] = a[{p!r}]")
+    lines.append(f"    return _resolve({name!r})(**kw)")
+    namespace = {"_resolve": _resolve, "_validate_args": _validate_args}
+    exec(compile("\n".join(lines), f"<tool-handler {name}>", "exec"), namespace)
+    return namespace[f"_h_{name}"]
+
+
+# Keys are interned so dispatch lookups hit CPython's pointer-equality fast
+# path for dict keys arriving from the wire.
 TOOL_HANDLERS = {
-    "set_bag_path": lambda args: set_bag_path(args["path"]),
-    "list_bags": lambda args: list_bags(args.get("directory")),
-    "bag_info": lambda args: bag_info(args.get("bag_path")),
-    "get_message_at_time": lambda args: get_message_at_time(
-        topic=args["topic"],
-        timestamp=args["timestamp"],
-        bag_path=args.get("bag_path"),
-        tolerance=args.get("tolerance", 0.1),
-    ),
-    "get_messages_in_range": lambda args: get_messages_in_range(
-        topic=args["topic"],
-        start_time=args["start_time"],
-        end_time=args["end_time"],
-        bag_path=args.get("bag_path"),
-        max_messages=args.get("max_messages", 100),
-    ),
-    "search_messages": lambda args: search_messages(
-        topic=args["topic"],
-        condition_type=args["condition_type"],
-        value=args["value"],
-        field=args.get("field"),
-        limit=args.get("limit", 10),
-        bag_path=args.get("bag_path"),
-        correlate_topic=args.get("correlate_topic"),
-        correlation_tolerance=args.get("correlation_tolerance", 0.1),
-    ),
-    "filter_bag": lambda args: filter_bag(
-        output_path=args["output_path"],
-        topics=args["topics"],
-        start_time=args.get("start_time"),
-        end_time=args.get("end_time"),
-        bag_path=args.get("bag_path"),
-    ),
-    "analyze_mcl_divergence": lambda args: analyze_mcl_divergence(
-        amcl_topic=args.get("amcl_topic", "/amcl_pose"),
-        jump_threshold=args.get("jump_threshold", 0.5),
-        covariance_warn=args.get("covariance_warn", 0.25),
-        start_time=args.get("start_time"),
-        end_time=args.get("end_time"),
-        bag_path=args.get("bag_path"),
-    ),
-    "analyze_trajectory": lambda args: analyze_trajectory(
-        pose_topic=args.get("pose_topic", "/odom"),
-        start_time=args.get("start_time"),
-        end_time=args.get("end_time"),
-        include_waypoints=args.get("include_waypoints", False),
-        waypoint_angle_threshold=args.get("waypoint_angle_threshold", 15.0),
-        bag_path=args.get("bag_path"),
-    ),
-    "analyze_lidar_scan": lambda args: analyze_lidar_scan(
-        scan_topic=args.get("scan_topic", "/scan"),
-        timestamp=args.get("timestamp"),
-        obstacle_threshold=args.get("obstacle_threshold", 1.0),
-        bag_path=args.get("bag_path"),
-    ),
-    "analyze_logs": lambda args: analyze_logs(
-        log_topic=args.get("log_topic", "/rosout"),
-        level=args.get("level"),
-        node_filter=args.get("node_filter"),
-        limit=args.get("limit", 50),
-        bag_path=args.get("bag_path"),
-    ),
-    "get_tf_tree": lambda args: get_tf_tree(bag_path=args.get("bag_path")),
-    "get_image_at_time": lambda args: get_image_at_time(
-        image_topic=args["image_topic"],
-        timestamp=args["timestamp"],
-        bag_path=args.get("bag_path"),
-        max_size=args.get("max_size", 1024),
-        quality=args.get("quality", 85),
-    ),
-    "plot_timeseries": lambda args: plot_timeseries(
-        fields=args["fields"],
-        start_time=args.get("start_time"),
-        end_time=args.get("end_time"),
-        title=args.get("title", "Time Series Plot"),
-        bag_path=args.get("bag_path"),
-    ),
-    "plot_2d": lambda args: plot_2d(
-        pose_topic=args.get("pose_topic", "/odom"),
-        start_time=args.get("start_time"),
-        end_time=args.get("end_time"),
-        title=args.get("title", "2D Trajectory"),
-        bag_path=args.get("bag_path"),
-    ),
-    "plot_lidar_scan": lambda args: plot_lidar_scan(
-        timestamp=args["timestamp"],
-        scan_topic=args.get("scan_topic", "/scan"),
-        title=args.get("title", "LiDAR Scan"),
-        bag_path=args.get("bag_path"),
-    ),
-    "get_topic_schema": lambda args: get_topic_schema(
-        topic=args["topic"],
-        bag_path=args.get("bag_path"),
-    ),
-    "analyze_imu": lambda args: analyze_imu(
-        imu_topic=args.get("imu_topic", "/imu"),
-        start_time=args.get("start_time"),
-        end_time=args.get("end_time"),
-        bag_path=args.get("bag_path"),
-    ),
-    "analyze_topic_stats": lambda args: analyze_topic_stats(
-        topic=args["topic"],
-        bag_path=args.get("bag_path"),
-    ),
-    "compare_topics": lambda args: compare_topics(
-        topic1=args["topic1"],
-        topic2=args["topic2"],
-        field1=args["field1"],
-        field2=args["field2"],
-        start_time=args.get("start_time"),
-        end_time=args.get("end_time"),
-        bag_path=args.get("bag_path"),
-    ),
-    "export_to_csv": lambda args: export_to_csv(
-        topic=args["topic"],
-        output_path=args["output_path"],
-        fields=args.get("fields"),
-        start_time=args.get("start_time"),
-        end_time=args.get("end_time"),
-        max_messages=args.get("max_messages", 10000),
-        bag_path=args.get("bag_path"),
-    ),
-    "detect_events": lambda args: detect_events(
-        topic=args["topic"],
-        field=args["field"],
-        event_type=args.get("event_type", "threshold"),
-        threshold=args.get("threshold"),
-        window_size=args.get("window_size", 10),
-        bag_path=args.get("bag_path"),
-    ),
-    "analyze_costmap_violations": lambda args: analyze_costmap_violations(
-        costmap_topic=args.get("costmap_topic", "/move_base/local_costmap/costmap"),
-        pose_topic=args.get("pose_topic", "/amcl_pose"),
-        cost_threshold=args.get("cost_threshold", 253),
-        bag_path=args.get("bag_path"),
-    ),
-    "analyze_path_tracking": lambda args: analyze_path_tracking(
-        path_topic=args.get("path_topic", "/move_base/GlobalPlanner/plan"),
-        pose_topic=args.get("pose_topic", "/amcl_pose"),
-        start_time=args.get("start_time"),
-        end_time=args.get("end_time"),
-        bag_path=args.get("bag_path"),
-    ),
-    "analyze_wheel_slip": lambda args: analyze_wheel_slip(
-        cmd_vel_topic=args.get("cmd_vel_topic", "/cmd_vel"),
-        odom_topic=args.get("odom_topic", "/odom"),
-        cmd_vel_field=args.get("cmd_vel_field", "twist.linear.x"),
-        odom_field=args.get("odom_field", "twist.twist.linear.x"),
-        slip_threshold=args.get("slip_threshold", 0.1),
-        start_time=args.get("start_time"),
-        end_time=args.get("end_time"),
-        bag_path=args.get("bag_path"),
-    ),
-    "analyze_navigation_health": lambda args: analyze_navigation_health(
-        log_topic=args.get("log_topic", "/rosout"),
-        recovery_topic=args.get("recovery_topic", "/move_base/debug/recovery_events"),
-        goal_topic=args.get("goal_topic", "/move_base/goal"),
-        nav_status_topic=args.get("nav_status_topic", "/move_base/navigation_status"),
-        bag_path=args.get("bag_path"),
-    ),
-    "analyze_lidar_timeseries": lambda args: analyze_lidar_timeseries(
-        scan_topic=args.get("scan_topic", "/scan"),
-        obstacle_threshold=args.get("obstacle_threshold", 1.0),
-        sample_interval=args.get("sample_interval", 1),
-        start_time=args.get("start_time"),
-        end_time=args.get("end_time"),
-        bag_path=args.get("bag_path"),
-    ),
-    "plot_comparison": lambda args: plot_comparison(
-        topic1=args["topic1"],
-        topic2=args["topic2"],
-        field1=args["field1"],
-        field2=args["field2"],
-        start_time=args.get("start_time"),
-        end_time=args.get("end_time"),
-        title=args.get("title", "Topic Comparison"),
-        bag_path=args.get("bag_path"),
-    ),
-    "analyze_pointcloud2": lambda args: analyze_pointcloud2(
-        topic=args.get("topic", "/points"),
-        timestamp=args.get("timestamp"),
-        max_points=args.get("max_points", 10000),
-        bag_path=args.get("bag_path"),
-    ),
-    "analyze_joint_states": lambda args: analyze_joint_states(
-        topic=args.get("topic", "/joint_states"),
-        start_time=args.get("start_time"),
-        end_time=args.get("end_time"),
-        bag_path=args.get("bag_path"),
-    ),
-    "analyze_diagnostics": lambda args: analyze_diagnostics(
-        topic=args.get("topic", "/diagnostics"),
-        start_time=args.get("start_time"),
-        end_time=args.get("end_time"),
-        bag_path=args.get("bag_path"),
-    ),
+    sys.intern(tool.name): _compile_handler(tool.name, tool.inputSchema)
+    for tool in TOOL_DEFINITIONS
+    if tool.name != "batch_execute"  # meta-tool; registered below
 }
 
+# Bound once so dispatch skips the attribute lookup on every request.
+_lookup_handler = TOOL_HANDLERS.get
+
 
 @server.list_tools()
-async def handle_list_tools() -> list[Tool]:
+async def handle_list_tools() -> tuple[Tool, ...]:
+    # Static catalogue: hand back the module-level tuple without copying.
     return TOOL_DEFINITIONS
 
 
+# Tool bodies are synchronous CPU/IO work inside async defs; awaiting them on
+# the event loop would stall list_tools and cancellation for the duration of a
+# bag scan or plot render. Only tools that touch no bag file run inline
+# (set_bag_path and close_bag are dict updates; batch_execute just fans out to
+# _dispatch) — list_bags walks a directory tree and bag_info parses a bag on
+# cache miss, so both go to the pool. Everything else is driven to completion
+# on a worker thread. Plot tools share one worker because pyplot keeps global
+# figure state; a process pool is out since tools rely on the in-process bag
+# cache.
+_INLINE_TOOLS = frozenset({"set_bag_path", "close_bag", "batch_execute"})
+_PLOT_TOOLS = frozenset({"plot_timeseries", "plot_2d", "plot_lidar_scan", "plot_comparison"})
+_WORKER_POOL = ThreadPoolExecutor(
+    max_workers=min(8, os.cpu_count() or 4), thread_name_prefix="rosbag-tool"
+)
+
+# Worst-case latency bound per call (RB_MCP_TOOL_TIMEOUT seconds, 0 disables).
+# A timed-out offloaded tool keeps its worker thread until it finishes; the
+# bound frees the request slot and gives the client an answer either way.
+_TOOL_TIMEOUT_S = float(os.environ.get("RB_MCP_TOOL_TIMEOUT", "60"))
+_PLOT_POOL = ThreadPoolExecutor(max_workers=1, thread_name_prefix="rosbag-plot")
+
+
+async def _execute(
+    name: str, handler: Callable, arguments: dict
+) -> list[TextContent | ImageContent]:
+    """Run an already-resolved handler under the executor policy for its name."""
+    coro = handler(arguments)
+    if name in _INLINE_TOOLS:
+        return await coro
+    pool = _PLOT_POOL if name in _PLOT_TOOLS else _WORKER_POOL
+    return await asyncio.get_running_loop().run_in_executor(pool, asyncio.run, coro)
+
+
+async def _dispatch(name: str, arguments: dict) -> list[TextContent | ImageContent]:
+    """Execute one tool by name, raising for unknown names (batch sub-calls)."""
+    handler = _lookup_handler(name)
+    if handler is None:
+        raise ValueError(f"Unknown tool: {name}")
+    return await _execute(name, handler, arguments)
+
+
+async def _batch_execute(args: dict) -> list[TextContent]:
+    """Fan out a list of {name, arguments} sub-calls concurrently.
+
+    Sub-calls go through the same _dispatch path as single RPCs, bounded by a
+    semaphore. With stop_on_error, sub-calls that have not started when a
+    failure lands are reported as skipped rather than cancelled mid-flight.
+    """
+    calls = args["calls"]
+    limit = asyncio.Semaphore(max(1, args.get("max_concurrent", 8)))
+    stop_on_error = args.get("stop_on_error", False)
+    failed = False
+
+    async def run_one(call: dict) -> dict:
+        nonlocal failed
+        name = call.get("name")
+        async with limit:
+            if failed and stop_on_error:
+                return {"name": name, "status": "skipped"}
+            try:
+                content = await _dispatch(name, call.get("arguments") or {})
+            except Exception as e:
+                failed = True
+                return {"name": name, "status": "error", "error": str(e)}
+            return {
+                "name": name,
+                "status": "ok",
+                "content": [c.model_dump(mode="json") for c in content],
+            }
+
+    results = await asyncio.gather(*(run_one(c) for c in calls))
+    return [TextContent(type="text", text=json.dumps(list(results), indent=2))]
+
+
+TOOL_HANDLERS[sys.intern("batch_execute")] = _batch_execute
+
+# Registration is complete; expose a read-only view. _lookup_handler stays
+# bound to the underlying dict, which is what dispatch actually probes.
+TOOL_HANDLERS = MappingProxyType(TOOL_HANDLERS)
+
+
+@lru_cache(maxsize=256)
+def _error_content(message: str) -> tuple[TextContent, ...]:
+    """Memoized error response: repeat failures (same unknown tool, same
+    exception text) reuse one immutable tuple instead of revalidating a
+    pydantic model per call."""
+    return (TextContent.model_construct(type="text", text=message),)
+
+
 @server.call_tool()
 async def handle_call_tool(name: str, arguments: dict) -> list[TextContent | ImageContent]:
-    logger.info(f"Tool called: {name}")
+    logger.info("Tool called: %s", name)
+    # Interning lets the dict probe compare the wire-decoded name against the
+    # interned keys by pointer instead of character-by-character.
+    name = sys.intern(name)
+    # Unknown-name check stays outside the try so the happy path is a
+    # straight-line sequence and lookup failures never pay exception teardown.
+    handler = _lookup_handler(name)
+    if handler is None:
+        logger.warning("Unknown tool requested: %s", name)
+        return list(_error_content(f"Unknown tool: {name}"))
+    logger.debug("Executing tool %s with arguments: %s", name, list(arguments.keys()))
     try:
-        handler = TOOL_HANDLERS.get(name)
-        if handler is None:
-            logger.warning(f"Unknown tool requested: {name}")
-            return [TextContent(type="text", text=f"Unknown tool: {name}")]
-        logger.debug(f"Executing tool {name} with arguments: {list(arguments.keys())}")
-        return await handler(arguments)
+        if _TOOL_TIMEOUT_S > 0:
+            return await asyncio.wait_for(_execute(name, handler, arguments), _TOOL_TIMEOUT_S)
+        return await _execute(name, handler, arguments)
+    except asyncio.TimeoutError:
+        logger.warning("Tool %s timed out after %.0fs", name, _TOOL_TIMEOUT_S)
+        return list(_error_content(f"Error: {name} timed out after {_TOOL_TIMEOUT_S:.0f}s"))
+    except (KeyError, ValueError, FileNotFoundError) as e:
+        # Expected client errors: bad arguments, unknown topics, missing bags.
+        # No traceback capture in the log; the message goes back verbatim.
+        logger.warning("Tool %s rejected: %s", name, e)
+        return list(_error_content(f"Error: {str(e)}"))
     except Exception as e:
-        logger.error(f"Error executing tool {name}: {str(e)}", exc_info=True)
-        return [TextContent(type="text", text=f"Error: {str(e)}")]
+        logger.exception("Error executing tool %s: %s", name, e)
+        return list(_error_content(f"Error: {str(e)}"))
 
 
 async def run_server():
+    # Any stray run_in_executor(None, ...) shares the sized tool pool instead
+    # of asyncio's lazily-created default executor.
+    asyncio.get_running_loop().set_default_executor(_WORKER_POOL)
     async with stdio_server() as (read_stream, write_stream):
         await server.run(read_stream, write_stream, server.create_initialization_options())
 
@@ -927,6 +976,12 @@ def main():
         level=logging.INFO, format="%(asctime)s [%(name)s] %(levelname)s: %(message)s"
     )
     logger.info("Starting rosbag-mcp server")
+    try:
+        import uvloop
+    except ImportError:  # optional 'fast' extra
+        pass
+    else:
+        uvloop.install()
     asyncio.run(run_server())
 
 
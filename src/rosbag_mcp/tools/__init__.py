@@ -1,43 +1,50 @@
 from __future__ import annotations
 
-from rosbag_mcp.tools.core import bag_info, list_bags, set_bag_path
-from rosbag_mcp.tools.events import detect_events
-from rosbag_mcp.tools.filter import filter_bag
-from rosbag_mcp.tools.introspection import analyze_logs, get_tf_tree
-from rosbag_mcp.tools.messages import get_message_at_time, get_messages_in_range, search_messages
-from rosbag_mcp.tools.navigation import (
-    analyze_costmap_violations,
-    analyze_navigation_health,
-    analyze_path_tracking,
-    analyze_wheel_slip,
-)
-from rosbag_mcp.tools.sensors import (
-    analyze_diagnostics,
-    analyze_imu,
-    analyze_joint_states,
-    analyze_lidar_scan,
-    analyze_lidar_timeseries,
-    analyze_pointcloud2,
-    get_image_at_time,
-)
-from rosbag_mcp.tools.slam import analyze_mcl_divergence, analyze_trajectory
-from rosbag_mcp.tools.statistics import (
-    analyze_topic_stats,
-    compare_topics,
-    export_to_csv,
-    get_topic_schema,
-)
-from rosbag_mcp.tools.visualization import (
-    plot_2d,
-    plot_comparison,
-    plot_lidar_scan,
-    plot_timeseries,
-)
+import importlib
+from typing import Any
+
+# Tool name -> submodule.  Submodules are imported on first attribute access
+# (PEP 562) so text-only tools don't pay for matplotlib/OpenCV at startup.
+_SUBMODULE_BY_NAME = {
+    "set_bag_path": "core",
+    "list_bags": "core",
+    "bag_info": "core",
+    "close_bag": "core",
+    "get_message_at_time": "messages",
+    "get_messages_in_range": "messages",
+    "search_messages": "messages",
+    "filter_bag": "filter",
+    "analyze_mcl_divergence": "slam",
+    "analyze_trajectory": "slam",
+    "analyze_lidar_scan": "sensors",
+    "analyze_logs": "introspection",
+    "get_tf_tree": "introspection",
+    "get_image_at_time": "sensors",
+    "plot_timeseries": "visualization",
+    "plot_2d": "visualization",
+    "plot_lidar_scan": "visualization",
+    "plot_comparison": "visualization",
+    "get_topic_schema": "statistics",
+    "analyze_imu": "sensors",
+    "analyze_topic_stats": "statistics",
+    "compare_topics": "statistics",
+    "export_to_csv": "statistics",
+    "detect_events": "events",
+    "analyze_costmap_violations": "navigation",
+    "analyze_path_tracking": "navigation",
+    "analyze_wheel_slip": "navigation",
+    "analyze_navigation_health": "navigation",
+    "analyze_lidar_timeseries": "sensors",
+    "analyze_pointcloud2": "sensors",
+    "analyze_joint_states": "sensors",
+    "analyze_diagnostics": "sensors",
+}
 
 __all__ = [
     "set_bag_path",
     "list_bags",
     "bag_info",
+    "close_bag",
     "get_message_at_time",
     "get_messages_in_range",
     "search_messages",
@@ -67,3 +74,16 @@ __all__ = [
     "analyze_joint_states",
     "analyze_diagnostics",
 ]
+
+
+def __getattr__(name: str) -> Any:
+    submodule = _SUBMODULE_BY_NAME.get(name)
+    if submodule is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(f"{__name__}.{submodule}"), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__() -> list[str]:
+    return sorted(set(globals()) | set(__all__))
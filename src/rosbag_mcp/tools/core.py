@@ -5,6 +5,9 @@ from dataclasses import asdict
 
 from mcp.types import TextContent
 
+from rosbag_mcp.bag_reader import (
+    close_bag as _close_bag,
+)
 from rosbag_mcp.bag_reader import (
     get_bag_info as _get_bag_info,
 )
@@ -43,3 +46,10 @@ async def bag_info(bag_path: str | None = None) -> list[TextContent]:
         f"Bag info retrieved: {info.path}, {len(info.topics)} topics, {info.message_count} messages"
     )
     return [TextContent(type="text", text=json_serialize(asdict(info)))]
+
+
+async def close_bag(bag_path: str | None = None) -> list[TextContent]:
+    """Evict any cached reader and indexes for a bag file."""
+    logger.info(f"Closing bag: {bag_path or 'current bag'}")
+    result = _close_bag(bag_path)
+    return [TextContent(type="text", text=result)]
@@ -12,6 +12,11 @@ from rosbag_mcp.tools.utils import json_serialize
 
 logger = logging.getLogger(__name__)
 
+# Shared read-only defaults: .get(key, {}) builds a fresh empty container on
+# every call, hit or miss; these sentinels are never mutated by callers.
+_EMPTY_DICT: dict = {}
+_EMPTY_LIST: list = []
+
 
 async def analyze_logs(
     log_topic: str = "/rosout",
@@ -96,10 +101,10 @@ async def get_tf_tree(bag_path: str | None = None) -> list[TextContent]:
 
     for msg in read_messages(bag_path=bag_path, topics=["/tf", "/tf_static"]):
         data = msg.data
-        tf_list = data.get("transforms", [])
+        tf_list = data.get("transforms", _EMPTY_LIST)
 
         for tf in tf_list:
-            header = tf.get("header", {})
+            header = tf.get("header", _EMPTY_DICT)
             parent = header.get("frame_id", "")
             child = tf.get("child_frame_id", "")
 
@@ -113,7 +118,7 @@ async def get_tf_tree(bag_path: str | None = None) -> list[TextContent]:
             return {"frame": frame, "note": "circular reference"}
         visited.add(frame)
         children = []
-        for child in transforms.get(frame, []):
+        for child in transforms.get(frame, _EMPTY_LIST):
             children.append(build_tree(child, visited.copy()))
         result = {"frame": frame}
         if children:
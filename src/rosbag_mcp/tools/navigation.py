@@ -12,6 +12,11 @@ from rosbag_mcp.tools.utils import get_nested_field, json_serialize
 
 logger = logging.getLogger(__name__)
 
+# Shared read-only defaults: .get(key, {}) builds a fresh empty container on
+# every call, hit or miss; these sentinels are never mutated by callers.
+_EMPTY_DICT: dict = {}
+_EMPTY_LIST: list = []
+
 
 async def analyze_costmap_violations(
     costmap_topic: str = "/move_base/local_costmap/costmap",
@@ -24,23 +29,23 @@ async def analyze_costmap_violations(
     poses: list[tuple[float, float, float]] = []
 
     for msg in read_messages(bag_path=bag_path, topics=[costmap_topic]):
-        info = msg.data.get("info", {})
+        info = msg.data.get("info", _EMPTY_DICT)
         costmap_data = {
             "resolution": info.get("resolution", 0.05),
             "width": info.get("width", 0),
             "height": info.get("height", 0),
-            "origin_x": info.get("origin", {}).get("position", {}).get("x", 0),
-            "origin_y": info.get("origin", {}).get("position", {}).get("y", 0),
-            "data": msg.data.get("data", []),
+            "origin_x": info.get("origin", _EMPTY_DICT).get("position", _EMPTY_DICT).get("x", 0),
+            "origin_y": info.get("origin", _EMPTY_DICT).get("position", _EMPTY_DICT).get("y", 0),
+            "data": msg.data.get("data", _EMPTY_LIST),
         }
         costmaps.append((msg.timestamp, costmap_data))
 
     for msg in read_messages(bag_path=bag_path, topics=[pose_topic]):
         data = msg.data
-        pose = data.get("pose", {})
+        pose = data.get("pose", _EMPTY_DICT)
         if "pose" in pose:
             pose = pose["pose"]
-        pos = pose.get("position", {})
+        pos = pose.get("position", _EMPTY_DICT)
         poses.append((msg.timestamp, pos.get("x", 0), pos.get("y", 0)))
 
     if not costmaps:
@@ -123,12 +128,12 @@ async def analyze_path_tracking(
     for msg in read_messages(
         bag_path=bag_path, topics=[path_topic], start_time=start_time, end_time=end_time
     ):
-        path_poses = msg.data.get("poses", [])
+        path_poses = msg.data.get("poses", _EMPTY_LIST)
         if path_poses:
             waypoints = []
             for p in path_poses:
-                pose = p.get("pose", {})
-                pos = pose.get("position", {})
+                pose = p.get("pose", _EMPTY_DICT)
+                pos = pose.get("position", _EMPTY_DICT)
                 x, y = pos.get("x", 0), pos.get("y", 0)
                 waypoints.append((x, y))
             if waypoints:
@@ -138,10 +143,10 @@ async def analyze_path_tracking(
         bag_path=bag_path, topics=[pose_topic], start_time=start_time, end_time=end_time
     ):
         data = msg.data
-        pose = data.get("pose", {})
+        pose = data.get("pose", _EMPTY_DICT)
         if "pose" in pose:
             pose = pose["pose"]
-        pos = pose.get("position", {})
+        pos = pose.get("position", _EMPTY_DICT)
         x, y = pos.get("x", 0), pos.get("y", 0)
         poses.append((msg.timestamp, x, y))
 
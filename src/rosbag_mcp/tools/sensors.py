@@ -16,6 +16,10 @@ from rosbag_mcp.tools.utils import json_serialize
 
 logger = logging.getLogger(__name__)
 
+# Shared read-only defaults: .get(key, []) builds a fresh empty container on
+# every call, hit or miss; these sentinels are never mutated by callers.
+_EMPTY_LIST: list = []
+
 # PointCloud2 datatype mapping
 POINTCLOUD_DTYPES = {
     1: ("int8", 1),
@@ -53,7 +57,7 @@ async def analyze_pointcloud2(
     data = messages[0].data
 
     # Parse PointCloud2 fields
-    fields = data.get("fields", [])
+    fields = data.get("fields", _EMPTY_LIST)
     if not fields:
         return [TextContent(type="text", text="No fields in PointCloud2 message")]
 
@@ -75,7 +79,7 @@ async def analyze_pointcloud2(
         return [TextContent(type="text", text="Could not parse PointCloud2 fields")]
 
     # Parse binary data
-    point_data = data.get("data", [])
+    point_data = data.get("data", _EMPTY_LIST)
     if isinstance(point_data, list):
         point_data = bytes(point_data)
 
@@ -163,10 +167,10 @@ async def analyze_joint_states(
         bag_path=bag_path, topics=[topic], start_time=start_time, end_time=end_time
     ):
         data = msg.data
-        names = data.get("name", [])
-        positions = data.get("position", [])
-        velocities = data.get("velocity", [])
-        efforts = data.get("effort", [])
+        names = data.get("name", _EMPTY_LIST)
+        positions = data.get("position", _EMPTY_LIST)
+        velocities = data.get("velocity", _EMPTY_LIST)
+        efforts = data.get("effort", _EMPTY_LIST)
 
         for i, name in enumerate(names):
             if name not in joint_data:
@@ -268,7 +272,7 @@ async def analyze_diagnostics(
         bag_path=bag_path, topics=[topic], start_time=start_time, end_time=end_time
     ):
         data = msg.data
-        status_list = data.get("status", [])
+        status_list = data.get("status", _EMPTY_LIST)
 
         for status in status_list:
             name = status.get("name", "unknown")
@@ -452,9 +456,9 @@ async def analyze_lidar_scan(
         return [TextContent(type="text", text="No LiDAR scan found")]
 
     data = scan_msg.data
-    ranges = data.get("ranges", [])
+    ranges = data.get("ranges", _EMPTY_LIST)
 
-    if not ranges:
+    if len(ranges) == 0:
         return [TextContent(type="text", text="No range data in scan")]
 
     ranges_arr = np.array(ranges)
@@ -514,8 +518,8 @@ async def get_image_at_time(
 
     if is_compressed:
         logger.debug(f"Detected CompressedImage format: {data.get('format', 'unknown')}")
-        img_data = data.get("data", [])
-        if not img_data:
+        img_data = data.get("data", _EMPTY_LIST)
+        if len(img_data) == 0:
             return [TextContent(type="text", text="Compressed image data is empty")]
 
         if isinstance(img_data, list):
@@ -532,9 +536,9 @@ async def get_image_at_time(
         width = data.get("width", 0)
         height = data.get("height", 0)
         encoding = data.get("encoding", "rgb8")
-        img_data = data.get("data", [])
+        img_data = data.get("data", _EMPTY_LIST)
 
-        if not img_data:
+        if len(img_data) == 0:
             return [TextContent(type="text", text="Image data is empty")]
 
         if isinstance(img_data, list):
@@ -634,8 +638,8 @@ async def analyze_lidar_timeseries(
             continue
 
         data = msg.data
-        ranges = data.get("ranges", [])
-        if not ranges:
+        ranges = data.get("ranges", _EMPTY_LIST)
+        if len(ranges) == 0:
             continue
 
         ranges_arr = np.array(ranges)
@@ -13,6 +13,10 @@ from rosbag_mcp.tools.utils import extract_position, extract_velocity, json_seri
 
 logger = logging.getLogger(__name__)
 
+# Shared read-only defaults: .get(key, {}) builds a fresh empty container on
+# every call, hit or miss; these sentinels are never mutated by callers.
+_EMPTY_DICT: dict = {}
+
 
 async def analyze_trajectory(
     pose_topic: str = "/odom",
@@ -109,6 +113,16 @@ async def analyze_trajectory(
         waypoints = []
         angle_threshold_rad = math.radians(waypoint_angle_threshold)
 
+        # Vectorized heading math: one arctan2 over every segment instead of
+        # two math.atan2 calls per point, with branchless [0, pi] folding.
+        pos_arr = np.asarray(positions, dtype=np.float64)
+        deltas = np.diff(pos_arr[:, :2], axis=0)
+        headings = np.arctan2(deltas[:, 1], deltas[:, 0])
+        heading_changes = np.abs(np.diff(headings))
+        heading_changes = np.where(
+            heading_changes > math.pi, 2 * math.pi - heading_changes, heading_changes
+        )
+
         # Always include start point
         waypoints.append(
             {
@@ -122,21 +136,7 @@ async def analyze_trajectory(
 
         # Detect waypoints based on heading changes
         for i in range(1, len(positions) - 1):
-            # Calculate heading from previous to current
-            dx1 = positions[i][0] - positions[i - 1][0]
-            dy1 = positions[i][1] - positions[i - 1][1]
-            heading1 = math.atan2(dy1, dx1)
-
-            # Calculate heading from current to next
-            dx2 = positions[i + 1][0] - positions[i][0]
-            dy2 = positions[i + 1][1] - positions[i][1]
-            heading2 = math.atan2(dy2, dx2)
-
-            # Calculate heading change
-            heading_change = abs(heading2 - heading1)
-            # Normalize to [-pi, pi]
-            if heading_change > math.pi:
-                heading_change = 2 * math.pi - heading_change
+            heading_change = float(heading_changes[i - 1])
 
             # Mark as waypoint if heading change exceeds threshold
             if heading_change > angle_threshold_rad:
@@ -185,7 +185,7 @@ async def analyze_trajectory(
 
 def _extract_covariance_diagonal(data: dict) -> tuple[float, float, float] | None:
     """Extract (xx, yy, yaw_yaw) from PoseWithCovarianceStamped covariance[36]."""
-    pose_cov = data.get("pose", {})
+    pose_cov = data.get("pose", _EMPTY_DICT)
     cov = pose_cov.get("covariance")
     if not cov or len(cov) < 36:
         return None
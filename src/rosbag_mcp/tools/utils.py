@@ -3,33 +3,59 @@ from __future__ import annotations
 import json
 import logging
 from dataclasses import asdict
+from functools import lru_cache
 from typing import Any
 
 from mcp.types import TextContent
 
+try:
+    import orjson
+except ImportError:  # optional 'fast' extra
+    orjson = None
+
 logger = logging.getLogger(__name__)
 
+# Shared read-only defaults: .get(key, {}) builds a fresh empty container on
+# every call, hit or miss; these sentinels are never mutated by callers.
+_EMPTY_DICT: dict = {}
+
 
 def text_result(obj: Any) -> list[TextContent]:
     """Wrap an object as a serialized TextContent response."""
     return [TextContent(type="text", text=json_serialize(obj))]
 
 
+def _json_default(o: Any) -> Any:
+    if hasattr(o, "__dataclass_fields__"):
+        return asdict(o)
+    if hasattr(o, "tolist"):
+        return o.tolist()
+    if isinstance(o, (set, frozenset)):
+        return list(o)
+    return str(o)
+
+
 def json_serialize(obj: Any) -> str:
-    def default(o):
-        if hasattr(o, "__dataclass_fields__"):
-            return asdict(o)
-        if hasattr(o, "tolist"):
-            return o.tolist()
-        if isinstance(o, (set, frozenset)):
-            return list(o)
-        return str(o)
+    """Serialize a tool result payload to indented JSON.
+
+    With orjson available this handles numpy arrays natively and is several
+    times faster on the large payloads plot/comparison tools produce; the
+    stdlib encoder is the fallback and yields equivalent output.
+    """
+    if orjson is not None:
+        option = orjson.OPT_INDENT_2 | orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS
+        return orjson.dumps(obj, default=_json_default, option=option).decode()
+    return json.dumps(obj, indent=2, default=_json_default)
+
 
-    return json.dumps(obj, indent=2, default=default)
+@lru_cache(maxsize=256)
+def _split_field_path(field_path: str) -> tuple[str, ...]:
+    """Parse a dotted path once; callers walk messages with the cached tuple."""
+    return tuple(field_path.split("."))
 
 
 def get_nested_field(data: dict, field_path: str) -> Any:
-    parts = field_path.split(".")
+    parts = _split_field_path(field_path)
     current = data
     for part in parts:
         if isinstance(current, dict):
@@ -64,8 +90,8 @@ def extract_velocity(data: dict) -> tuple[float, float] | None:
         twist = data["twist"]
         if "twist" in twist:
             twist = twist["twist"]
-        linear = twist.get("linear", {})
-        angular = twist.get("angular", {})
+        linear = twist.get("linear", _EMPTY_DICT)
+        angular = twist.get("angular", _EMPTY_DICT)
         return (linear.get("x", 0), angular.get("z", 0))
     if "linear" in data and "angular" in data:
         return (data["linear"].get("x", 0), data["angular"].get("z", 0))
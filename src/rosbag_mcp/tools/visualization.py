@@ -21,6 +21,10 @@ from rosbag_mcp.tools.utils import extract_position, get_nested_field
 
 logger = logging.getLogger(__name__)
 
+# Shared read-only defaults: .get(key, []) builds a fresh empty container on
+# every call, hit or miss; these sentinels are never mutated by callers.
+_EMPTY_LIST: list = []
+
 
 async def plot_timeseries(
     fields: list[str],
@@ -153,7 +157,7 @@ async def plot_lidar_scan(
         return [TextContent(type="text", text="No LiDAR scan found")]
 
     data = scan_msg.data
-    ranges = np.array(data.get("ranges", []))
+    ranges = np.array(data.get("ranges", _EMPTY_LIST))
     angle_min = data.get("angle_min", 0)
     angle_increment = data.get("angle_increment", 0.01)
 
@@ -4,7 +4,7 @@ from __future__ import annotations
 
 from dataclasses import dataclass
 
-from rosbag_mcp.bag_reader import BagInfo, BagMessage, _msg_to_dict
+from rosbag_mcp.bag_reader import BagInfo, BagMessage, _flatten_msg, _msg_to_dict
 
 
 class TestBagReaderPublicAPI:
@@ -75,6 +75,125 @@ class TestMsgToDict:
         assert result == {"x": 1, "y": None}
 
 
+class TestFlattenMsg:
+    """Test the per-msgtype compiled flattener."""
+
+    def test_matches_generic_walk(self):
+        """Test compiled flattener produces the same output as _msg_to_dict."""
+
+        @dataclass
+        class Stamp:
+            sec: int
+            nanosec: int
+
+        @dataclass
+        class Header:
+            stamp: Stamp
+            frame_id: str
+
+        @dataclass
+        class Msg:
+            header: Header
+            ranges: list
+
+        msg = Msg(header=Header(stamp=Stamp(sec=100, nanosec=500), frame_id="laser"), ranges=[1, 2])
+        result = _flatten_msg(msg, "test_msgs/msg/Fake")
+        assert result == _msg_to_dict(msg)
+
+    def test_flattener_is_cached_and_reused(self):
+        """Test the same msgtype reuses one compiled flattener."""
+        from rosbag_mcp.bag_reader import _FLATTENERS
+
+        @dataclass
+        class Point:
+            x: float
+            y: float
+
+        _flatten_msg(Point(x=1.0, y=2.0), "test_msgs/msg/Point")
+        assert "test_msgs/msg/Point" in _FLATTENERS
+        fn = _FLATTENERS["test_msgs/msg/Point"]
+        assert _flatten_msg(Point(x=3.0, y=4.0), "test_msgs/msg/Point") == {"x": 3.0, "y": 4.0}
+        assert _FLATTENERS["test_msgs/msg/Point"] is fn
+
+    def test_structure_divergence_falls_back(self):
+        """Test a message whose structure differs from the sample still converts."""
+
+        @dataclass
+        class A:
+            x: float
+
+        @dataclass
+        class B:
+            y: float
+
+        assert _flatten_msg(A(x=1.0), "test_msgs/msg/Divergent") == {"x": 1.0}
+        assert _flatten_msg(B(y=2.0), "test_msgs/msg/Divergent") == {"y": 2.0}
+
+
+class TestReadMessagesJson:
+    """Test the pre-encoded JSON streaming variant."""
+
+    def test_arguments_forwarded_by_keyword(self, monkeypatch):
+        """Test topics/times/path land in the right read_messages parameters."""
+        import json
+
+        from rosbag_mcp import bag_reader
+
+        captured = {}
+
+        def fake_read_messages(bag_path=None, topics=None, start_time=None, end_time=None):
+            captured.update(
+                bag_path=bag_path, topics=topics, start_time=start_time, end_time=end_time
+            )
+            yield bag_reader.BagMessage(
+                topic="/odom", timestamp=1.5, data={"x": 1.0}, msg_type="nav_msgs/msg/Odometry"
+            )
+
+        monkeypatch.setattr(bag_reader, "read_messages", fake_read_messages)
+        frames = list(
+            bag_reader.read_messages_json(
+                topics=["/odom"], start_time=1.0, end_time=2.0, bag_path="/bags/test.bag"
+            )
+        )
+        assert captured == {
+            "bag_path": "/bags/test.bag",
+            "topics": ["/odom"],
+            "start_time": 1.0,
+            "end_time": 2.0,
+        }
+        record = json.loads(frames[0])
+        assert record == {
+            "topic": "/odom",
+            "timestamp": 1.5,
+            "msg_type": "nav_msgs/msg/Odometry",
+            "data": {"x": 1.0},
+        }
+
+
+class TestDeepSizeof:
+    """Test the sampled size accounting helper."""
+
+    def test_nested_structures_counted(self):
+        """Test nested dicts/lists grow the size beyond the shallow getsizeof."""
+        import sys
+
+        from rosbag_mcp.bag_reader import _deep_sizeof
+
+        data = {"pose": {"position": {"x": 1.0, "y": 2.0}}, "ranges": [0.1] * 10}
+        assert _deep_sizeof(data) > sys.getsizeof(data)
+
+    def test_depth_is_capped(self):
+        """Test deeply nested structures do not recurse unboundedly."""
+        from rosbag_mcp.bag_reader import _deep_sizeof
+
+        data: dict = {}
+        leaf = data
+        for _ in range(100):
+            leaf["next"] = {}
+            leaf = leaf["next"]
+        assert _deep_sizeof(data) > 0
+
+
 class TestBagInfo:
     """Test BagInfo dataclass."""
 
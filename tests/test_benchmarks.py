@@ -99,7 +99,11 @@ class TestCacheBenchmarks:
         test_path = "/mock/test.bag"
 
         # Mock os.stat and os.path.realpath to avoid file system access
-        mock_stat = type("stat_result", (), {"st_size": 1000, "st_mtime_ns": 123456789})()
+        mock_stat = type(
+            "stat_result",
+            (),
+            {"st_dev": 1, "st_ino": 42, "st_size": 1000, "st_mtime_ns": 123456789},
+        )()
 
         with (
             patch("os.stat", return_value=mock_stat),
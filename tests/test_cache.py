@@ -2,20 +2,14 @@
 
 from __future__ import annotations
 
+import os
+import time
 from dataclasses import dataclass
-from typing import Any
 
+import numpy as np
 import pytest
 
-from rosbag_mcp.cache import BagKey, MessageCache, TopicTimeIndex
-
-
-@dataclass
-class FakeBagMessage:
-    topic: str
-    timestamp: float
-    data: dict[str, Any]
-    msg_type: str
+from rosbag_mcp.cache import BagKey, CachedTopic, MessageCache, TopicTimeIndex
 
 
 class TestTopicTimeIndex:
@@ -102,47 +96,128 @@ class TestTopicTimeIndex:
         assert result == (5, 5)
 
 
+class TestTopicTimeIndexSerialization:
+    """Test the binary to_bytes/from_bytes round trip."""
+
+    def test_round_trip(self):
+        """Test stamps survive a bytes round trip unchanged."""
+        index = TopicTimeIndex(timestamps_ns=[1_000_000_000, 2_000_000_000, 3_000_000_000])
+        restored = TopicTimeIndex.from_bytes(index.to_bytes())
+        assert np.array_equal(restored.timestamps_ns, index.timestamps_ns)
+
+    def test_size_is_8_bytes_per_stamp(self):
+        """Test the encoding is raw int64, not decimal text."""
+        index = TopicTimeIndex(timestamps_ns=[1, 2, 3, 4])
+        assert len(index.to_bytes()) == 32
+
+
 class TestBagKey:
     """Test BagKey dataclass."""
 
     def test_equality(self):
         """Test BagKey equality."""
-        key1 = BagKey(realpath="/path/to/bag.bag", size=1000, mtime_ns=123456789)
-        key2 = BagKey(realpath="/path/to/bag.bag", size=1000, mtime_ns=123456789)
+        key1 = BagKey(dev=1, ino=42, size=1000, mtime_ns=123456789)
+        key2 = BagKey(dev=1, ino=42, size=1000, mtime_ns=123456789)
         assert key1 == key2
 
     def test_different_files(self):
         """Test BagKey inequality for different files."""
-        key1 = BagKey(realpath="/path/to/bag1.bag", size=1000, mtime_ns=123456789)
-        key2 = BagKey(realpath="/path/to/bag2.bag", size=2000, mtime_ns=987654321)
+        key1 = BagKey(dev=1, ino=42, size=1000, mtime_ns=123456789)
+        key2 = BagKey(dev=1, ino=43, size=2000, mtime_ns=987654321)
         assert key1 != key2
 
     def test_frozen(self):
         """Test BagKey is frozen (immutable)."""
-        key = BagKey(realpath="/path/to/bag.bag", size=1000, mtime_ns=123456789)
+        key = BagKey(dev=1, ino=42, size=1000, mtime_ns=123456789)
         with pytest.raises(Exception):  # FrozenInstanceError or AttributeError
-            key.realpath = "/new/path.bag"  # type: ignore
-
-
-def _make_msgs(topic: str, count: int, start_ts: float = 1.0) -> list[FakeBagMessage]:
-    return [
-        FakeBagMessage(
-            topic=topic,
-            timestamp=start_ts + i * 0.1,
-            data={"value": i},
-            msg_type="std_msgs/msg/Float64",
-        )
-        for i in range(count)
-    ]
+            key.ino = 43  # type: ignore
+
+    def test_hardlinks_share_identity(self, tmp_path):
+        """Test two paths to the same inode produce the same key."""
+        from rosbag_mcp.cache import bag_key_for
+
+        bag = tmp_path / "test.bag"
+        bag.write_bytes(b"data")
+        link = tmp_path / "link.bag"
+        os.link(bag, link)
+        assert bag_key_for(bag) == bag_key_for(link)
+
+    def test_stat_cache_memoizes_within_bucket(self, tmp_path):
+        """Test repeated lookups in one time bucket reuse the cached BagKey."""
+        from rosbag_mcp.cache import _stat_path
+
+        bag = tmp_path / "test.bag"
+        bag.write_bytes(b"data")
+        key1 = _stat_path(str(bag), bucket=1)
+        key2 = _stat_path(str(bag), bucket=1)
+        assert key1 is key2
+
+    def test_stat_cache_revalidates_in_new_bucket(self, tmp_path):
+        """Test a new time bucket re-stats and sees file changes."""
+        from rosbag_mcp.cache import _stat_path
+
+        bag = tmp_path / "test.bag"
+        bag.write_bytes(b"data")
+        key1 = _stat_path(str(bag), bucket=1)
+        bag.write_bytes(b"more data here")
+        key2 = _stat_path(str(bag), bucket=2)
+        assert key2.size != key1.size
+
+
+def _make_entry(topic: str, count: int, start_ts: float = 1.0) -> CachedTopic:
+    return CachedTopic(
+        topic=topic,
+        msg_type="std_msgs/msg/Float64",
+        timestamps_ns=np.asarray(
+            [int((start_ts + i * 0.1) * 1e9) for i in range(count)], dtype=np.int64
+        ),
+        raw=[b"\x00" * 8 for _ in range(count)],
+        data=[{"value": i} for i in range(count)],
+    )
+
+
+class TestSidecarIndex:
+    """Test the persistent on-disk index sidecar."""
+
+    def test_round_trip_across_handles(self, tmp_path):
+        """Test indexes stored by one handle are visible to a fresh handle."""
+        from rosbag_mcp.cache import BagHandle, bag_key_for
+
+        bag = tmp_path / "test.bag"
+        bag.write_bytes(b"data")
+        key = bag_key_for(bag)
+
+        handle = BagHandle(key, str(bag))
+        stamps = np.asarray([1_000_000_000, 2_000_000_000, 3_000_000_000], dtype=np.int64)
+        handle.store_index("/odom", TopicTimeIndex(timestamps_ns=stamps))
+
+        fresh = BagHandle(key, str(bag))
+        index = fresh.get_or_build_index("/odom")
+        assert index is not None
+        assert np.array_equal(index.timestamps_ns, stamps)
+
+    def test_stale_sidecar_ignored(self, tmp_path):
+        """Test a sidecar written for older bag contents is not loaded."""
+        from rosbag_mcp.cache import BagHandle, BagKey, bag_key_for
+
+        bag = tmp_path / "test.bag"
+        bag.write_bytes(b"data")
+        key = bag_key_for(bag)
+        handle = BagHandle(key, str(bag))
+        handle.store_index("/odom", TopicTimeIndex(timestamps_ns=[1_000_000_000]))
+
+        changed_key = BagKey(dev=key.dev, ino=key.ino, size=key.size + 1, mtime_ns=key.mtime_ns)
+        fresh = BagHandle(changed_key, str(bag))
+        assert fresh.get_or_build_index("/odom") is None
 
 
 class TestMessageCache:
     def test_commit_and_get(self):
         cache = MessageCache()
-        msgs = _make_msgs("/odom", 10)
-        cache.commit("/odom", msgs, 800)
+        entry = _make_entry("/odom", 10)
+        cache.commit("/odom", entry, 800)
         assert cache.has("/odom")
-        assert cache.get("/odom") is msgs
+        assert cache.get("/odom") is entry
         assert cache.total_bytes == 800
 
     def test_get_missing_topic(self):
@@ -152,27 +227,41 @@ class TestMessageCache:
 
     def test_get_range_full(self):
         cache = MessageCache()
-        msgs = _make_msgs("/odom", 10, start_ts=1.0)
-        cache.commit("/odom", msgs, 800)
+        entry = _make_entry("/odom", 10, start_ts=1.0)
+        cache.commit("/odom", entry, 800)
         result = cache.get_range("/odom", None, None)
-        assert result is msgs
+        assert result is entry
 
     def test_get_range_sliced(self):
         cache = MessageCache()
-        msgs = _make_msgs("/odom", 100, start_ts=0.0)
-        cache.commit("/odom", msgs, 8000)
+        entry = _make_entry("/odom", 100, start_ts=0.0)
+        cache.commit("/odom", entry, 8000)
         start_ns = int(2.0 * 1e9)
         end_ns = int(5.0 * 1e9)
         result = cache.get_range("/odom", start_ns, end_ns)
         assert result is not None
-        assert all(2.0 <= m.timestamp <= 5.0 for m in result)
+        assert all(start_ns <= ts <= end_ns for ts in result.timestamps_ns)
         assert len(result) > 0
         assert len(result) < 100
+        assert len(result.timestamps_ns) == len(result.data)
 
     def test_get_range_missing_topic(self):
         cache = MessageCache()
         assert cache.get_range("/odom", None, None) is None
 
+    def test_get_range_view_returns_entry_and_bounds(self):
+        cache = MessageCache()
+        entry = _make_entry("/odom", 100, start_ts=0.0)
+        cache.commit("/odom", entry, 8000)
+        start_ns = int(2.0 * 1e9)
+        end_ns = int(5.0 * 1e9)
+        view = cache.get_range_view("/odom", start_ns, end_ns)
+        assert view is not None
+        got, lo, hi = view
+        assert got is entry  # no copy
+        assert all(start_ns <= ts <= end_ns for ts in entry.timestamps_ns[lo:hi])
+        assert 0 < hi - lo < 100
+
     def test_can_cache_accepts_small(self):
         cache = MessageCache()
         assert cache.can_cache(raw_msg_size=500, msg_count=1000)
@@ -185,14 +274,16 @@ class TestMessageCache:
         cache = MessageCache(max_per_topic=1000)
         assert not cache.can_cache(raw_msg_size=100, msg_count=20)
 
-    def test_can_cache_rejects_over_total_budget(self):
+    def test_can_cache_accepts_when_full(self):
+        # A full cache is not an admission barrier: commit() evicts LRU
+        # entries to make room, so reserve() must not gate on total usage.
         cache = MessageCache(max_bytes=5000)
-        cache.commit("/a", _make_msgs("/a", 5), 4500)
-        assert not cache.can_cache(raw_msg_size=100, msg_count=10)
+        cache.commit("/a", _make_entry("/a", 5), 4500)
+        assert cache.can_cache(raw_msg_size=100, msg_count=10)
 
     def test_budget_ok_tracks_total(self):
         cache = MessageCache(max_bytes=2000, max_per_topic=1500)
-        cache.commit("/a", _make_msgs("/a", 5), 1000)
+        cache.commit("/a", _make_entry("/a", 5), 1000)
         assert cache.budget_ok(500)
         assert not cache.budget_ok(1500)
 
@@ -203,8 +294,8 @@ class TestMessageCache:
 
     def test_clear(self):
         cache = MessageCache()
-        cache.commit("/odom", _make_msgs("/odom", 10), 800)
-        cache.commit("/imu", _make_msgs("/imu", 10), 400)
+        cache.commit("/odom", _make_entry("/odom", 10), 800)
+        cache.commit("/imu", _make_entry("/imu", 10), 400)
         assert cache.total_bytes == 1200
         cache.clear()
         assert cache.total_bytes == 0
@@ -213,7 +304,7 @@ class TestMessageCache:
 
     def test_stats(self):
         cache = MessageCache()
-        cache.commit("/odom", _make_msgs("/odom", 5), 500)
+        cache.commit("/odom", _make_entry("/odom", 5), 500)
         s = cache.stats()
         assert "/odom" in s["cached_topics"]
         assert s["total_bytes"] == 500
@@ -221,8 +312,8 @@ class TestMessageCache:
 
     def test_multiple_topics(self):
         cache = MessageCache()
-        cache.commit("/odom", _make_msgs("/odom", 10), 800)
-        cache.commit("/imu", _make_msgs("/imu", 20), 400)
+        cache.commit("/odom", _make_entry("/odom", 10), 800)
+        cache.commit("/imu", _make_entry("/imu", 20), 400)
         assert cache.has("/odom")
         assert cache.has("/imu")
         assert cache.total_bytes == 1200
@@ -230,3 +321,169 @@ class TestMessageCache:
         imu = cache.get("/imu")
         assert odom is not None and len(odom) == 10
         assert imu is not None and len(imu) == 20
+
+
+class TestMessageCacheLRU:
+    def test_commit_evicts_lru_until_budget_fits(self):
+        cache = MessageCache(max_bytes=2000)
+        cache.commit("/a", _make_entry("/a", 5), 800)
+        cache.commit("/b", _make_entry("/b", 5), 800)
+        cache.commit("/c", _make_entry("/c", 5), 800)
+        assert not cache.has("/a")
+        assert cache.has("/b")
+        assert cache.has("/c")
+        assert cache.total_bytes == 1600
+
+    def test_get_promotes_to_mru(self):
+        cache = MessageCache(max_bytes=2000)
+        cache.commit("/a", _make_entry("/a", 5), 800)
+        cache.commit("/b", _make_entry("/b", 5), 800)
+        cache.get("/a")  # promote /a, making /b the LRU
+        cache.commit("/c", _make_entry("/c", 5), 800)
+        assert cache.has("/a")
+        assert not cache.has("/b")
+        assert cache.has("/c")
+
+    def test_recommit_same_topic_replaces_bytes(self):
+        cache = MessageCache()
+        cache.commit("/a", _make_entry("/a", 5), 800)
+        cache.commit("/a", _make_entry("/a", 10), 500)
+        assert cache.total_bytes == 500
+
+    def test_cold_newcomer_rejected_when_victim_is_hot(self):
+        cache = MessageCache(max_bytes=1000)
+        cache.commit("/hot", _make_entry("/hot", 5), 800)
+        for _ in range(5):
+            cache.get("/hot")
+        cache.commit("/cold", _make_entry("/cold", 5), 800)
+        assert cache.has("/hot")
+        assert not cache.has("/cold")
+
+    def test_demanded_newcomer_admitted(self):
+        cache = MessageCache(max_bytes=1000)
+        cache.commit("/a", _make_entry("/a", 5), 800)
+        for _ in range(3):
+            cache.get("/b")  # misses still register demand in the sketch
+        cache.commit("/b", _make_entry("/b", 5), 800)
+        assert cache.has("/b")
+        assert not cache.has("/a")
+
+
+class TestReadMessagesEviction:
+    """Test eviction is reachable from the live read path, not just commit()."""
+
+    @dataclass
+    class _FakeConn:
+        topic: str
+        msgtype: str
+        msgcount: int
+
+    @dataclass
+    class _FakeValue:
+        size: int
+
+    class _FakeReader:
+        def __init__(self, topics: dict):
+            self.connections = [
+                TestReadMessagesEviction._FakeConn(
+                    topic=topic, msgtype="test_msgs/msg/Value", msgcount=len(messages)
+                )
+                for topic, messages in topics.items()
+            ]
+            self._topics = topics
+
+        def messages(self, connections=None, start=None, stop=None):
+            for conn in connections:
+                yield from ((conn, ts, raw) for ts, raw in self._topics[conn.topic])
+
+        def deserialize(self, rawdata, msgtype):
+            return TestReadMessagesEviction._FakeValue(size=len(rawdata))
+
+        def __exit__(self, *exc):
+            pass
+
+    def test_full_cache_admits_hot_topic_via_read_messages(self, tmp_path, monkeypatch):
+        """Test reading a demanded topic displaces a stale one once full."""
+        from rosbag_mcp import bag_reader
+        from rosbag_mcp.cache import BagHandle, bag_key_for
+
+        bag = tmp_path / "test.bag"
+        bag.write_bytes(b"data")
+        handle = BagHandle(bag_key_for(bag), str(bag))
+        msgs = [(int(i * 1e8), b"\x01" * 16) for i in range(5)]
+        handle._reader = self._FakeReader({"/a": msgs, "/b": msgs})
+        handle.message_cache = cache = MessageCache()
+        monkeypatch.setattr(bag_reader._cache, "get_handle", lambda path: handle)
+
+        list(bag_reader.read_messages(bag_path=str(bag), topics=["/a"]))
+        assert cache.has("/a")
+
+        # Shrink the budget so /b can only be cached by displacing /a, and
+        # register demand for /b so the admission check prefers it.
+        cache.max_bytes = cache.total_bytes + 1
+        for _ in range(3):
+            cache.get("/b")
+
+        list(bag_reader.read_messages(bag_path=str(bag), topics=["/b"]))
+        assert cache.has("/b")
+        assert not cache.has("/a")
+
+
+class TestPooledReaderConcurrency:
+    """Test scan serialization and deferred close on the pooled reader."""
+
+    class _StubReader:
+        def __init__(self):
+            self.closed = False
+
+        def __exit__(self, *exc):
+            self.closed = True
+
+    def _handle_with_stub(self, tmp_path):
+        from rosbag_mcp.cache import BagHandle, bag_key_for
+
+        bag = tmp_path / "test.bag"
+        bag.write_bytes(b"data")
+        handle = BagHandle(bag_key_for(bag), str(bag))
+        handle._reader = self._StubReader()
+        return handle
+
+    def test_close_deferred_until_scan_exits(self, tmp_path):
+        """Test eviction mid-scan keeps the reader open until the scan ends."""
+        handle = self._handle_with_stub(tmp_path)
+        reader = handle._reader
+        with handle.reader_ctx():
+            handle.close()
+            assert not reader.closed
+        assert reader.closed
+        assert handle._reader is None
+
+    def test_close_without_scan_is_immediate(self, tmp_path):
+        handle = self._handle_with_stub(tmp_path)
+        reader = handle._reader
+        handle.close()
+        assert reader.closed
+        assert handle._reader is None
+
+    def test_scans_are_serialized(self, tmp_path):
+        """Test two threads never hold reader_ctx at the same time."""
+        import threading
+
+        handle = self._handle_with_stub(tmp_path)
+        active = 0
+        overlapped = []
+
+        def scan():
+            nonlocal active
+            with handle.reader_ctx():
+                active += 1
+                overlapped.append(active > 1)
+                time.sleep(0.01)
+                active -= 1
+
+        threads = [threading.Thread(target=scan) for _ in range(4)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        assert not any(overlapped)